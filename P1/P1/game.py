@@ -252,6 +252,139 @@ class Grid:
                 bools.append(False)
         return bools
 
+def _popcount(n):
+    return bin(n).count('1')
+if hasattr(int, 'bit_count'): _popcount = int.bit_count
+
+class BitGrid(Grid):
+    """
+    A Grid of booleans packed into the bits of a single int, with cell (x,y)
+    stored at bit x * height + y.  Data is still accessed via grid[x][y].
+
+    Ints are immutable, so copy() is O(1): the copies share the same bits
+    until one of them is written.  count() is a popcount, asList() visits only
+    the set bits and the hash is taken from the int itself.
+    """
+    def __init__(self, width, height, initialValue=False, bitRepresentation=None):
+        if initialValue not in [False, True]: raise Exception('Grids can only contain booleans')
+        self.CELLS_PER_INT = 30
+
+        self.width = width
+        self.height = height
+        self.bits = (1 << (width * height)) - 1 if initialValue else 0
+        if bitRepresentation:
+            self._unpackBits(bitRepresentation)
+
+    def fromGrid(grid):
+        "Returns a BitGrid holding the same booleans as grid"
+        g = BitGrid(grid.width, grid.height)
+        for x, y in grid.asList():
+            g.bits |= 1 << (x * g.height + y)
+        return g
+    fromGrid = staticmethod(fromGrid)
+
+    def __getitem__(self, i):
+        if i < 0: i += self.width
+        if not 0 <= i < self.width: raise IndexError('BitGrid index out of range')
+        return _BitGridColumn(self, i)
+
+    def __setitem__(self, key, item):
+        for y, value in enumerate(item):
+            self._set(key, y, value)
+
+    def __iter__(self):
+        for x in range(self.width):
+            yield _BitGridColumn(self, x)
+
+    def _get(self, x, y):
+        return (self.bits >> (x * self.height + y)) & 1 == 1
+
+    def _set(self, x, y, value):
+        if value not in [False, True]: raise Exception('Grids can only contain booleans')
+        bit = 1 << (x * self.height + y)
+        if value:
+            self.bits |= bit
+        else:
+            self.bits &= ~bit
+
+    def getData(self):
+        "The cells as a list of columns, as in Grid.data"
+        return [list(column) for column in self]
+    data = property(getData)
+
+    def __str__(self):
+        out = [[str(self._get(x, y))[0] for x in range(self.width)] for y in range(self.height)]
+        out.reverse()
+        return '\n'.join([''.join(x) for x in out])
+
+    def __eq__(self, other):
+        if other == None: return False
+        if isinstance(other, BitGrid):
+            return self.bits == other.bits and self.width == other.width and self.height == other.height
+        if not isinstance(other, Grid): return NotImplemented
+        return self.data == other.data
+
+    def __hash__(self):
+        """
+        The same as Grid.__hash__, which hashes the int with bit
+        x * height + y set for each true cell: that int is self.bits.  So a
+        BitGrid and an equal Grid can share a dict or set.
+        """
+        return hash(self.bits)
+
+    def copy(self):
+        g = BitGrid(self.width, self.height)
+        g.bits = self.bits
+        return g
+
+    def deepCopy(self):
+        return self.copy()
+
+    def shallowCopy(self):
+        return self.copy()
+
+    def count(self, item =True ):
+        ones = _popcount(self.bits)
+        if item: return ones
+        return self.width * self.height - ones
+
+    def asList(self, key = True):
+        bits = self.bits
+        if not key: bits = ~bits & ((1 << (self.width * self.height)) - 1)
+        list = []
+        while bits:
+            low = bits & -bits
+            index = low.bit_length() - 1
+            list.append( (index // self.height, index % self.height) )
+            bits ^= low
+        return list
+
+class _BitGridColumn:
+    "The column grid[x] of a BitGrid; reads and writes go through to the grid"
+    __slots__ = ('grid', 'x')
+
+    def __init__(self, grid, x):
+        self.grid = grid
+        self.x = x
+
+    def _index(self, y):
+        if y < 0: y += self.grid.height
+        if not 0 <= y < self.grid.height: raise IndexError('BitGrid index out of range')
+        return y
+
+    def __getitem__(self, y):
+        return self.grid._get(self.x, self._index(y))
+
+    def __setitem__(self, y, value):
+        self.grid._set(self.x, self._index(y), value)
+
+    def __len__(self):
+        return self.grid.height
+
+    def __iter__(self):
+        for y in range(self.grid.height):
+            yield self.grid._get(self.x, y)
+
 def reconstituteGrid(bitRep):
     if type(bitRep) is not type((1,2)):
         return bitRep
@@ -307,7 +440,22 @@ class Actions:
         return (dx * speed, dy * speed)
     directionToVector = staticmethod(directionToVector)
 
+    def getMoveTable(walls):
+        """
+        The MoveTable of a walls Grid.  Walls never change during a game, so
+        it is built on first use and kept on the Grid.
+        """
+        table = getattr(walls, 'moveTable', None)
+        if table == None:
+            table = MoveTable(walls)
+            walls.moveTable = table
+        return table
+    getMoveTable = staticmethod(getMoveTable)
+
     def getPossibleActions(config, walls):
+        actions = Actions.getMoveTable(walls).actions.get(config.pos)
+        if actions != None: return list(actions)
+
         possible = []
         x, y = config.pos
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -327,6 +475,9 @@ class Actions:
     getPossibleActions = staticmethod(getPossibleActions)
 
     def getLegalNeighbors(position, walls):
+        neighbors = Actions.getMoveTable(walls).neighbors.get(position)
+        if neighbors != None: return list(neighbors)
+
         x,y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
         neighbors = []
@@ -346,6 +497,51 @@ class Actions:
         return (x + dx, y + dy)
     getSuccessor = staticmethod(getSuccessor)
 
+class MoveTable:
+    """
+    The legal moves from every open cell of a walls Grid, so that movement
+    rules and search problems look them up instead of testing walls:
+
+      actions[(x, y)]                 Actions.getPossibleActions on the cell
+      neighbors[(x, y)]               Actions.getLegalNeighbors of the cell
+      ghostActions[((x, y), facing)]  GhostRules.getLegalActions for a ghost
+                                      on the cell facing that direction
+      successors[(x, y)]              (action, (nextx, nexty)) for each legal
+                                      move North, South, East and West, in
+                                      that order, as the search problems in
+                                      searchAgents.py expand them
+
+    Cells on the edge of the grid are left out.  Positions between cells
+    (scared ghosts move half a cell at a time) are not in the table, and the
+    callers fall back to the arithmetic on them.
+    """
+    def __init__(self, walls):
+        self.actions = {}
+        self.neighbors = {}
+        self.ghostActions = {}
+        self.successors = {}
+        searchOrder = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+        for x in range(1, walls.width - 1):
+            for y in range(1, walls.height - 1):
+                if walls[x][y]: continue
+                actions = []
+                neighbors = []
+                for direction, (dx, dy) in Actions._directionsAsList:
+                    if not walls[x + dx][y + dy]:
+                        actions.append(direction)
+                        neighbors.append((x + dx, y + dy))
+                self.actions[(x, y)] = tuple(actions)
+                self.neighbors[(x, y)] = tuple(neighbors)
+                self.successors[(x, y)] = tuple([(direction, neighbors[actions.index(direction)])
+                                                 for direction in searchOrder if direction in actions])
+                moves = [action for action in actions if action != Directions.STOP]
+                for facing in Actions._directions:
+                    reverse = Actions.reverseDirection(facing)
+                    if reverse in moves and len(moves) > 1:
+                        self.ghostActions[((x, y), facing)] = tuple([action for action in moves if action != reverse])
+                    else:
+                        self.ghostActions[((x, y), facing)] = tuple(moves)
+
 class GameStateData:
     """
 
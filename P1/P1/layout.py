@@ -1,5 +1,6 @@
 from util import manhattanDistance
 from game import Grid
+from game import BitGrid
 import os
 import random
 from functools import reduce
@@ -15,7 +16,7 @@ class Layout:
         self.width = len(layoutText[0])
         self.height= len(layoutText)
         self.walls = Grid(self.width, self.height, False)
-        self.food = Grid(self.width, self.height, False)
+        self.food = BitGrid(self.width, self.height, False)
         self.capsules = []
         self.agentPositions = []
         self.numGhosts = 0
@@ -77,7 +78,13 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        """
+        Layouts are never changed after parsing, so a copy shares the grids
+        and text of the original instead of parsing the text again.
+        """
+        layout = Layout.__new__(Layout)
+        layout.__dict__.update(self.__dict__)
+        return layout
 
     def processLayoutText(self, layoutText):
         """
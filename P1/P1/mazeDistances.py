@@ -0,0 +1,126 @@
+# mazeDistances.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+This file contains a MazeDistances object which holds the shortest path
+length between every pair of open cells in a maze.  The table is computed
+once per wall Grid with a breadth first search from every open cell, after
+which any maze distance is a single array lookup.
+
+Example:
+distances = getMazeDistances(gameState.getWalls())
+distances.getDistance( (1,1), (10,10) )
+"""
+
+from array import array
+
+# Stored for pairs of cells with no path between them
+UNREACHABLE = 0xFFFF
+
+class MazeDistances:
+    """
+    All-pairs maze distances for one wall Grid.
+
+    Every open cell gets a dense integer id (its index in walls.asList(False))
+    and the distances are kept in a flat array of unsigned shorts, row-major
+    by source id.
+    """
+    def __init__(self, walls, distances=None):
+        """
+        walls: a Grid of wall indicator variables (see game.py)
+        distances: an already computed table to use instead of running BFS
+        """
+        self.width = walls.width
+        self.height = walls.height
+        self.cells = walls.asList(False)
+        self.cellIds = [-1] * (self.width * self.height)
+        for i, (x, y) in enumerate(self.cells):
+            self.cellIds[x * self.height + y] = i
+        if distances == None:
+            distances = self._computeDistances()
+        self.distances = distances
+
+    def getCellId(self, pos):
+        "Returns the dense id of the open cell at pos"
+        x, y = pos
+        if 0 <= x < self.width and 0 <= y < self.height:
+            cellId = self.cellIds[x * self.height + y]
+            if cellId >= 0: return cellId
+        raise Exception('Position is not an open cell of the maze: ' + str(pos))
+
+    def getDistance(self, pos1, pos2):
+        """
+        Returns the maze distance between two open cells, or UNREACHABLE if
+        no path connects them.
+        """
+        return self.distances[self.getCellId(pos1) * len(self.cells) + self.getCellId(pos2)]
+
+    def getClosest(self, pos, targets):
+        """
+        Returns the distance from pos to the closest of the given positions,
+        or None if none of them can be reached.
+        """
+        row = self.getCellId(pos) * len(self.cells)
+        best = UNREACHABLE
+        for target in targets:
+            distance = self.distances[row + self.getCellId(target)]
+            if distance < best: best = distance
+        if best == UNREACHABLE: return None
+        return best
+
+    def _computeDistances(self):
+        numCells = len(self.cells)
+        neighbors = []
+        for x, y in self.cells:
+            adjacent = []
+            for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)):
+                if 0 <= nx < self.width and 0 <= ny < self.height:
+                    cellId = self.cellIds[nx * self.height + ny]
+                    if cellId >= 0: adjacent.append(cellId)
+            neighbors.append(adjacent)
+
+        distances = array('H', [UNREACHABLE]) * (numCells * numCells)
+        for source in range(numCells):
+            row = source * numCells
+            distances[row + source] = 0
+            fringe = [source]
+            depth = 0
+            while fringe:
+                depth += 1
+                nextFringe = []
+                for cell in fringe:
+                    for other in neighbors[cell]:
+                        if distances[row + other] == UNREACHABLE:
+                            distances[row + other] = depth
+                            nextFringe.append(other)
+                fringe = nextFringe
+        return distances
+
+_distancesCache = {}
+_lastWalls = None
+_lastDistances = None
+
+def getMazeDistances(walls):
+    """
+    Returns the MazeDistances for a wall Grid, computing them the first time
+    these walls are seen.  Repeated calls with the same Grid object skip
+    hashing the walls.
+    """
+    global _lastWalls, _lastDistances
+    if walls is not _lastWalls:
+        if walls not in _distancesCache:
+            _distancesCache[walls] = MazeDistances(walls)
+        _lastWalls = walls
+        _lastDistances = _distancesCache[walls]
+    return _lastDistances
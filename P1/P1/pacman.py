@@ -375,6 +375,8 @@ class GhostRules:
         reach a dead end, but can turn 90 degrees at intersections.
         """
         conf = state.getGhostState( ghostIndex ).configuration
+        actions = Actions.getMoveTable( state.data.layout.walls ).ghostActions.get( (conf.pos, conf.direction) )
+        if actions != None: return list( actions )
         possibleActions = Actions.getPossibleActions( conf, state.data.layout.walls )
         reverse = Actions.reverseDirection( conf.direction )
         if Directions.STOP in possibleActions:
@@ -63,6 +63,34 @@ class SearchProblem:
         util.raiseNotDefined()
 
 
+class SearchNode:
+    """
+    A node of the search tree: a state, the node it was expanded from, the
+    action that led here and the total path cost so far.  Only the last
+    action is stored, so pushing a node costs O(1) regardless of its depth;
+    the full plan is rebuilt from the parent pointers once a goal is found.
+    """
+    __slots__ = ('state', 'parent', 'action', 'cost')
+
+    def __init__(self, state, parent=None, action=None, cost=0):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+
+    def getPath(self):
+        """
+        Returns the list of actions leading from the root to this node.
+        """
+        actions = []
+        node = self
+        while node.parent is not None:
+            actions.append(node.action)
+            node = node.parent
+        actions.reverse()
+        return actions
+
+
 def tinyMazeSearch(problem):
     """
     Returns a sequence of moves that solves tinyMaze.  For any other maze, the
@@ -88,64 +116,49 @@ def depthFirstSearch(problem):
     print("Start's successors:", problem.getSuccessors(problem.getStartState()))
     """
     "*** YOUR CODE HERE ***"
-    closed=[]  # closed = empty set
+    closed=set()  # closed = empty set, hashed so membership is O(1)
     fringe=util.Stack()
-    fringe.push(([],problem.getStartState())) 
-    # push item: (state, path)
+    fringe.push(SearchNode(problem.getStartState()))
     while (True):
         if fringe.isEmpty():
             util.raiseNotDefined()
-        move,node=fringe.pop()
-        if problem.isGoalState(node):
-            return move
-        if node not in closed:
-            closed.append(node)
-            for child_node in problem.getSuccessors(node):
-                fringe.push((move+[child_node[0]],child_node[2]))
-                # push state+[], successor
+        node=fringe.pop()
+        if problem.isGoalState(node.state):
+            return node.getPath()
+        if node.state not in closed:
+            closed.add(node.state)
+            for action,step_cost,child in problem.getSuccessors(node.state):
+                fringe.push(SearchNode(child,node,action,node.cost+step_cost))
     util.raiseNotDefined()
 
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
     "*** YOUR CODE HERE ***"
     # BFS: Queue
-    closed=[]
+    closed=set()
+    start=problem.getStartState()
+    frontier={start}
+    # frontier: states waiting in the queue, so each state is queued only once
     fringe=util.Queue()
-    fringe.push(([],problem.getStartState()))
-    # push item: (path,state)
+    fringe.push(SearchNode(start))
     while(True):
         if fringe.isEmpty():
             util.raiseNotDefined()
-        move,node=fringe.pop()
-        if problem.isGoalState(node):
-            return move
-        if node not in closed:
-            closed.append(node)
-            for child_node in problem.getSuccessors(node):
-                fringe.push((move+[child_node[0]],child_node[2]))
+        node=fringe.pop()
+        frontier.remove(node.state)
+        if problem.isGoalState(node.state):
+            return node.getPath()
+        closed.add(node.state)
+        for action,step_cost,child in problem.getSuccessors(node.state):
+            if child not in closed and child not in frontier:
+                frontier.add(child)
+                fringe.push(SearchNode(child,node,action,node.cost+step_cost))
     util.raiseNotDefined()
 
 def uniformCostSearch(problem):
     """Search the node of least total cost first."""
     "*** YOUR CODE HERE ***"
-    closed=[]
-    fringe=util.PriorityQueue()
-    fringe.push(([],0,problem.getStartState()),0)
-    # action, cost, successor
-    # add cost to the item, and cost to be priority
-    while (True):
-        if fringe.isEmpty():
-            util.raiseNotDefined()
-        (move,cost,node)=fringe.pop()
-        if problem.isGoalState(node):
-            return move
-        if node not in closed:
-            closed.append(node)
-            for child_node in problem.getSuccessors(node):
-                # update the priority queue with pri: cost
-                fringe.update((move+[child_node[0]],cost+child_node[1],child_node[2]),
-                              cost+child_node[1])
-    util.raiseNotDefined()
+    return aStarSearch(problem)
     
     
 
@@ -160,21 +173,28 @@ def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     "*** YOUR CODE HERE ***"
     #util.raiseNotDefined()
-    closed=[]
+    closed=set()
+    start=problem.getStartState()
+    frontier={start:SearchNode(start)}
+    # frontier: state -> node of the cheapest known path to it; the priority
+    # queue is keyed by state so a cheaper path is a decrease-key
     fringe=util.PriorityQueue()
-    fringe.push(([],0,problem.getStartState()),heuristic(problem.getStartState(),problem))
+    fringe.update(start,heuristic(start,problem))
     # priority=cost+heuristic
     while(True):
         if fringe.isEmpty():
             util.raiseNotDefined()
-        (move,cost,node)=fringe.pop()
-        if problem.isGoalState(node):
-            return move
-        if node not in closed:
-            closed.append(node)
-            for child_node in problem.getSuccessors(node):
-                fringe.update((move+[child_node[0]],cost+child_node[1],child_node[2]),
-                              cost+child_node[1]+heuristic(child_node[2],problem))
+        node=frontier.pop(fringe.pop())
+        if problem.isGoalState(node.state):
+            return node.getPath()
+        closed.add(node.state)
+        for action,step_cost,child in problem.getSuccessors(node.state):
+            if child in closed:
+                continue
+            child_cost=node.cost+step_cost
+            if child not in frontier or child_cost<frontier[child].cost:
+                frontier[child]=SearchNode(child,node,action,child_cost)
+                fringe.update(child,child_cost+heuristic(child,problem))
     util.raiseNotDefined()
 
 
@@ -40,6 +40,7 @@ from game import Actions
 import util
 import time
 import search
+import mazeDistances
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -193,14 +194,9 @@ class PositionSearchProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state
-            dx, dy = Actions.directionToVector(action)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextState = (nextx, nexty)
-                cost = self.costFn(nextState)
-                successors.append( ( action, cost, nextState) )
+        for action, nextState in Actions.getMoveTable(self.walls).successors[state]:
+            cost = self.costFn(nextState)
+            successors.append( ( action, cost, nextState) )
 
         # Bookkeeping for display purposes
         self._expanded += 1 # DO NOT CHANGE
@@ -329,35 +325,26 @@ class CornersProblem(search.SearchProblem):
         """
 
         successors = []
-        for action in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            # Add a successor state to the successor list if the action is legal
-            # Here's a code snippet for figuring out whether a new position hits a wall:
-            #   x,y = currentPosition
-            #   dx, dy = Actions.directionToVector(action)
-            #   nextx, nexty = int(x + dx), int(y + dy)
-            #   hitsWall = self.walls[nextx][nexty]
-
-            "*** YOUR CODE HERE ***"     
-            
-            currentPosition=state[0]
-            # state[0]=curr_pos, state[1]=bool corners
-            x,y=currentPosition
-            # curr_pos=(x,y)
-            dx, dy = Actions.directionToVector(action)
-            # the movement in (x,y)
-            nextx, nexty = int(x + dx), int(y + dy)
-            # the next position
-            hitsWall = self.walls[nextx][nexty]
-            # if it hits the wall                 
-            if not hitsWall: # it does not hit the wall   
-                for i in range(4):  # which corner it reaches
-                    reach_goal=state[1]
-                    if (nextx,nexty)==self.corners[i]: # reach the ith corner
-                        st=list(reach_goal)
-                        st[i]=True
-                        reach_goal=tuple(st)
-                        break
-                successors.append((action,1,((nextx,nexty),reach_goal)))     
+        # Add a successor state to the successor list if the action is legal
+        # Here's a code snippet for figuring out whether a new position hits a wall:
+        #   x,y = currentPosition
+        #   dx, dy = Actions.directionToVector(action)
+        #   nextx, nexty = int(x + dx), int(y + dy)
+        #   hitsWall = self.walls[nextx][nexty]
+
+        "*** YOUR CODE HERE ***"     
+        # state[0]=curr_pos, state[1]=bool corners
+        # the move table lists the legal actions, North, South, East, West,
+        # with the positions they reach
+        for action, (nextx, nexty) in Actions.getMoveTable(self.walls).successors[state[0]]:
+            reach_goal=state[1]
+            for i in range(4):  # which corner it reaches
+                if (nextx,nexty)==self.corners[i]: # reach the ith corner
+                    st=list(reach_goal)
+                    st[i]=True
+                    reach_goal=tuple(st)
+                    break
+            successors.append((action,1,((nextx,nexty),reach_goal)))     
         self._expanded += 1 # DO NOT CHANGE # a?
         return successors
 
@@ -437,14 +424,13 @@ class FoodSearchProblem:
         "Returns successor states, the actions they require, and a cost of 1."
         successors = []
         self._expanded += 1 # DO NOT CHANGE
-        for direction in [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]:
-            x,y = state[0]
-            dx, dy = Actions.directionToVector(direction)
-            nextx, nexty = int(x + dx), int(y + dy)
-            if not self.walls[nextx][nexty]:
-                nextFood = state[1].copy()
+        for direction, (nextx, nexty) in Actions.getMoveTable(self.walls).successors[state[0]]:
+            nextFood = state[1]
+            if nextFood[nextx][nexty]:
+                # Only copy the grid when a pellet is eaten
+                nextFood = nextFood.copy()
                 nextFood[nextx][nexty] = False
-                successors.append(( direction, 1,((nextx, nexty), nextFood)))
+            successors.append(( direction, 1,((nextx, nexty), nextFood)))
         return successors
 
     def getCostOfActions(self, actions):
@@ -499,13 +485,11 @@ def foodHeuristic(state, problem):
     "*** YOUR CODE HERE ***"
     if problem.isGoalState(state):
         return 0
-    heuristic=list()
-    # find all the h(x) for the food grids
-    for foods in foodGrid.asList():
-        food_problem=PositionSearchProblem(problem.startingGameState,start=position,
-                                           goal=foods,warn=False,visualize=False)
-        heuristic.append(len(search.ucs(food_problem)))  # the path using ucs method
-    return max(heuristic)
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances']=mazeDistances.getMazeDistances(problem.walls)
+    distances=problem.heuristicInfo['mazeDistances']
+    # h(x) = maze distance to the farthest food grid
+    return max(distances.getDistance(position,foods) for foods in foodGrid.asList())
     return 0
 
     
@@ -580,9 +564,9 @@ class AnyFoodSearchProblem(PositionSearchProblem):
 
 def mazeDistance(point1, point2, gameState):
     """
-    Returns the maze distance between any two points, using the search functions
-    you have already built. The gameState can be any game state -- Pacman's
-    position in that state is ignored.
+    Returns the maze distance between any two points, looked up in the
+    all-pairs table for this layout (see mazeDistances.py). The gameState can
+    be any game state -- Pacman's position in that state is ignored.
 
     Example usage: mazeDistance( (2,4), (5,6), gameState)
 
@@ -593,5 +577,4 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    return mazeDistances.getMazeDistances(walls).getDistance(point1, point2)
@@ -0,0 +1,145 @@
+# searchBenchmark.py
+# ------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Times the search functions in search.py over the P1 layouts and reports
+nodes expanded per second and peak memory for every run.
+
+To compare two versions of search.py, save the results of one run and pass
+them to the next:
+
+> python searchBenchmark.py -o before.json
+  (change search.py)
+> python searchBenchmark.py -c before.json
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+import layout
+import pacman
+import search
+import searchAgents
+
+# (layout, problem, search function, heuristic)
+CASES = [
+    ('mediumMaze',    'PositionSearchProblem', 'dfs',   None),
+    ('mediumMaze',    'PositionSearchProblem', 'bfs',   None),
+    ('mediumMaze',    'PositionSearchProblem', 'ucs',   None),
+    ('mediumMaze',    'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('bigMaze',       'PositionSearchProblem', 'dfs',   None),
+    ('bigMaze',       'PositionSearchProblem', 'bfs',   None),
+    ('bigMaze',       'PositionSearchProblem', 'ucs',   None),
+    ('bigMaze',       'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('openMaze',      'PositionSearchProblem', 'bfs',   None),
+    ('openMaze',      'PositionSearchProblem', 'astar', 'manhattanHeuristic'),
+    ('mediumCorners', 'CornersProblem',        'bfs',   None),
+    ('bigCorners',    'CornersProblem',        'bfs',   None),
+    ('bigCorners',    'CornersProblem',        'astar', 'cornersHeuristic'),
+    ('tinySearch',    'FoodSearchProblem',     'astar', 'foodHeuristic'),
+]
+
+def makeProblem(problemName, gameState):
+    if problemName == 'PositionSearchProblem':
+        return searchAgents.PositionSearchProblem(gameState, warn=False, visualize=False)
+    return getattr(searchAgents, problemName)(gameState)
+
+def makeSearchFunction(fnName, heuristicName):
+    func = getattr(search, fnName)
+    if heuristicName == None:
+        return func
+    heuristic = getattr(searchAgents, heuristicName)
+    return lambda problem: func(problem, heuristic=heuristic)
+
+def runCase(layoutName, problemName, fnName, heuristicName, repeat=1):
+    """
+    Runs one case and returns a dict of its measurements.  The timed runs and
+    the memory run are kept apart so that tracemalloc does not skew the timing.
+    """
+    gameState = pacman.GameState()
+    gameState.initialize(layout.getLayout(layoutName), 0)
+    searchFunction = makeSearchFunction(fnName, heuristicName)
+
+    best = None
+    for i in range(repeat):
+        problem = makeProblem(problemName, gameState)
+        start = time.perf_counter()
+        actions = searchFunction(problem)
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+
+    problem = makeProblem(problemName, gameState)
+    tracemalloc.start()
+    searchFunction(problem)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {'layout': layoutName, 'problem': problemName, 'fn': fnName,
+            'heuristic': heuristicName, 'cost': problem.getCostOfActions(actions),
+            'expanded': problem._expanded, 'seconds': best,
+            'nodesPerSec': problem._expanded / max(best, 1e-9), 'peakBytes': peak}
+
+def caseKey(result):
+    return '%s/%s/%s' % (result['layout'], result['fn'], result['heuristic'] or '-')
+
+def printResults(results, baseline=None):
+    header = '%-36s %6s %8s %9s %12s %10s' % ('case', 'cost', 'expanded', 'seconds', 'nodes/sec', 'peak KiB')
+    if baseline != None: header += ' %8s %8s' % ('speedup', 'mem')
+    print(header)
+    for result in results:
+        line = '%-36s %6d %8d %9.4f %12.0f %10.1f' % (caseKey(result), result['cost'], result['expanded'],
+                                                      result['seconds'], result['nodesPerSec'],
+                                                      result['peakBytes'] / 1024.0)
+        old = baseline.get(caseKey(result)) if baseline != None else None
+        if old != None:
+            line += ' %7.2fx %7.2fx' % (old['seconds'] / max(result['seconds'], 1e-9),
+                                        old['peakBytes'] / float(max(result['peakBytes'], 1)))
+        print(line)
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python searchBenchmark.py <options>')
+    parser.add_option('-l', '--layouts', dest='layouts', default=None,
+                      help='Comma separated layouts to run (default: every layout in CASES)')
+    parser.add_option('-r', '--repeat', dest='repeat', type='int', default=3,
+                      help='Timed runs per case; the fastest is reported [Default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='Write the results as JSON to this file')
+    parser.add_option('-c', '--compare', dest='compare', default=None,
+                      help='JSON results of an earlier run to compare against')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    cases = CASES
+    if options.layouts != None:
+        names = options.layouts.split(',')
+        cases = [case for case in CASES if case[0] in names]
+
+    results = [runCase(*case, repeat=options.repeat) for case in cases]
+
+    baseline = None
+    if options.compare != None:
+        with open(options.compare) as f:
+            baseline = dict((caseKey(result), result) for result in json.load(f))
+    printResults(results, baseline)
+
+    if options.output != None:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -145,37 +145,51 @@ class PriorityQueue:
       has a priority associated with it and the client is usually interested
       in quick retrieval of the lowest-priority item in the queue. This
       data structure allows O(1) access to the lowest-priority item.
+
+      update() is a lazy decrease-key: the superseded heap entry is left
+      behind and skipped when it reaches the top, so items passed to update()
+      must be hashable.  Items added with push() are not tracked by update().
     """
     def  __init__(self):
         self.heap = []
         self.count = 0
+        self.entryFinder = {} # item -> live heap entry, for items given to update()
 
     def push(self, item, priority):
-        entry = (priority, self.count, item)
+        entry = (priority, self.count, item, False)
         heapq.heappush(self.heap, entry)
         self.count += 1
 
     def pop(self):
-        (_, _, item) = heapq.heappop(self.heap)
+        while True:
+            entry = heapq.heappop(self.heap)
+            if not self._isStale(entry):
+                break
+        (_, _, item, tracked) = entry
+        if tracked:
+            del self.entryFinder[item]
         return item
 
     def isEmpty(self):
+        while self.heap and self._isStale(self.heap[0]):
+            heapq.heappop(self.heap)
         return len(self.heap) == 0
 
     def update(self, item, priority):
-        # If item already in priority queue with higher priority, update its priority and rebuild the heap.
+        # If item already in priority queue with higher priority, update its priority.
         # If item already in priority queue with equal or lower priority, do nothing.
         # If item not in priority queue, do the same thing as self.push.
-        for index, (p, c, i) in enumerate(self.heap):
-            if i == item:
-                if p <= priority:
-                    break
-                del self.heap[index]
-                self.heap.append((priority, c, item))
-                heapq.heapify(self.heap)
-                break
-        else:
-            self.push(item, priority)
+        entry = self.entryFinder.get(item)
+        if entry != None and entry[0] <= priority:
+            return
+        entry = (priority, self.count, item, True)
+        self.entryFinder[item] = entry
+        heapq.heappush(self.heap, entry)
+        self.count += 1
+
+    def _isStale(self, entry):
+        "An update() entry is stale once a later update() has replaced it"
+        return entry[3] and self.entryFinder.get(entry[2]) is not entry
 
 class PriorityQueueWithFunction(PriorityQueue):
     """
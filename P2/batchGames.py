@@ -0,0 +1,168 @@
+# batchGames.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Plays many independent games across a pool of worker processes.
+
+Everything after -- is passed to the game's own readCommand (pacman.py, or
+busters.py where there is no pacman.py), with -q added so that games run
+without graphics.  Game i is seeded from --seed and i alone, so a batch
+plays the same games whatever the number of workers.
+
+One JSON line per game (score, win, moves, agent time) is written to the
+output file as soon as the game finishes; a summary with 95% confidence
+intervals is printed at the end.
+
+> python batchGames.py -n 1000 -w 16 -o results.jsonl -- -p ExpectimaxAgent -l mediumClassic
+"""
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import json
+import math
+import os
+import random
+import sys
+import time
+
+def defaultModule():
+    if os.path.exists('pacman.py'):
+        return 'pacman'
+    return 'busters'
+
+def gameSeed(seed, gameIndex):
+    return '%s-%d' % (seed, gameIndex)
+
+def playGame(moduleName, gameArgv, gameIndex, seed):
+    """
+    Plays one game and returns its result as a dict.  Runs in the workers.
+    """
+    module = __import__(moduleName)
+    args = module.readCommand(gameArgv + ['-q'])
+    args['numGames'] = 1
+
+    # time the Pacman agent's moves
+    pacman = args['pacman']
+    agentTime = [0.0]
+    getAction = pacman.getAction
+    def timedGetAction(state):
+        start = time.perf_counter()
+        try:
+            return getAction(state)
+        finally:
+            agentTime[0] += time.perf_counter() - start
+    pacman.getAction = timedGetAction
+
+    random.seed(gameSeed(seed, gameIndex))
+    start = time.perf_counter()
+    game = module.runGames(**args)[-1]
+    moves = len([move for move in game.moveHistory if move[0] == 0])
+    return {'game': gameIndex, 'seed': gameSeed(seed, gameIndex),
+            'score': game.state.getScore(), 'win': game.state.isWin(),
+            'moves': moves, 'agentTime': agentTime[0],
+            'seconds': time.perf_counter() - start}
+
+def runBatch(moduleName, gameArgv, numGames, workers=1, output=None, seed=0):
+    """
+    Plays numGames games and returns their results in the order they
+    finished, writing each to the output file as it arrives.
+    """
+    results = []
+    out = None
+    if output != None:
+        out = open(output, 'w')
+
+    def record(result):
+        results.append(result)
+        if out != None:
+            out.write(json.dumps(result) + '\n')
+            out.flush()
+
+    try:
+        if workers <= 1:
+            for i in range(numGames):
+                record(playGame(moduleName, gameArgv, i, seed))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                futures = [pool.submit(playGame, moduleName, gameArgv, i, seed)
+                           for i in range(numGames)]
+                for future in as_completed(futures):
+                    record(future.result())
+    finally:
+        if out != None:
+            out.close()
+    return results
+
+def meanInterval(values, z=1.96):
+    "Returns (mean, standard deviation, half width of the confidence interval)"
+    n = len(values)
+    mean = sum(values) / float(n)
+    if n < 2:
+        return mean, 0.0, 0.0
+    std = math.sqrt(sum([(v - mean) ** 2 for v in values]) / (n - 1))
+    return mean, std, z * std / math.sqrt(n)
+
+def wilsonInterval(successes, n, z=1.96):
+    "Wilson score interval for a proportion"
+    p = successes / float(n)
+    center = (p + z * z / (2 * n)) / (1 + z * z / n)
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / (1 + z * z / n)
+    return center - half, center + half
+
+def summarize(results):
+    n = len(results)
+    wins = len([result for result in results if result['win']])
+    scores = [result['score'] for result in results]
+    score, scoreStd, scoreHalf = meanInterval(scores)
+    moves = sum([result['moves'] for result in results])
+    agentTime = sum([result['agentTime'] for result in results])
+    low, high = wilsonInterval(wins, n)
+    return {'games': n, 'wins': wins, 'winRate': wins / float(n), 'winRateCI': [low, high],
+            'score': score, 'scoreStd': scoreStd, 'scoreCI': [score - scoreHalf, score + scoreHalf],
+            'minScore': min(scores), 'maxScore': max(scores),
+            'moves': moves / float(n), 'agentTimePerMove': agentTime / max(moves, 1)}
+
+def printSummary(summary):
+    print('Games:          %d' % summary['games'])
+    print('Win Rate:       %d/%d (%.3f, 95%% CI %.3f - %.3f)' % (
+        summary['wins'], summary['games'], summary['winRate'],
+        summary['winRateCI'][0], summary['winRateCI'][1]))
+    print('Average Score:  %.2f (95%% CI %.2f - %.2f, std %.2f, min %s, max %s)' % (
+        summary['score'], summary['scoreCI'][0], summary['scoreCI'][1], summary['scoreStd'],
+        summary['minScore'], summary['maxScore']))
+    print('Average Moves:  %.1f' % summary['moves'])
+    print('Agent Time:     %.4f s per move' % summary['agentTimePerMove'])
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python batchGames.py <options> -- <game options>')
+    parser.add_option('-n', '--numGames', dest='numGames', type='int', default=100,
+                      help='How many games to play [Default: %default]')
+    parser.add_option('-w', '--workers', dest='workers', type='int', default=os.cpu_count() or 1,
+                      help='Worker processes; 1 plays every game here [Default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='Write a JSON line per game to this file')
+    parser.add_option('-s', '--seed', dest='seed', default='0',
+                      help='Seed the per-game seeds are made from [Default: %default]')
+    parser.add_option('-m', '--module', dest='module', default=defaultModule(),
+                      help='The game to play: pacman or busters [Default: %default]')
+    options, gameArgv = parser.parse_args(argv)
+    options.gameArgv = gameArgv
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    results = runBatch(options.module, options.gameArgv, options.numGames,
+                       options.workers, options.output, options.seed)
+    if results:
+        printSummary(summarize(results))
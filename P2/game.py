@@ -185,10 +185,11 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(
-            height)] for x in range(width)]
         if bitRepresentation:
-            self._unpackBits(bitRepresentation)
+            self._unpackBits(bitRepresentation, initialValue)
+        else:
+            self.data = [[initialValue for y in range(
+                height)] for x in range(width)]
 
     def __getitem__(self, i):
         return self.data[i]
@@ -248,52 +249,80 @@ class Grid:
 
         (width, height, bitPackedInts...)
         """
+        digits = self._cellDigits()
+        size = self.CELLS_PER_INT
         bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
+        # The first cell of each int is its most significant bit
+        for start in range(0, (len(digits) // size + 1) * size, size):
+            bits.append(int(digits[start:start + size].ljust(size, '0'), 2))
         return tuple(bits)
 
+    def toBytes(self):
+        """
+        Returns a compact bytes representation: the width and height as two
+        little-endian 16 bit ints followed by one bit per cell, where cell
+        (x,y) is bit x * height + y.  See Grid.fromBytes.
+        """
+        numCells = self.width * self.height
+        packed = int(self._cellDigits()[::-1] or '0', 2)
+        return (self.width.to_bytes(2, 'little') + self.height.to_bytes(2, 'little') +
+                packed.to_bytes((numCells + 7) // 8, 'little'))
+
+    def fromBytes(data):
+        """
+        Rebuilds a Grid from the output of Grid.toBytes.
+        """
+        width = int.from_bytes(data[0:2], 'little')
+        height = int.from_bytes(data[2:4], 'little')
+        packed = int.from_bytes(data[4:], 'little')
+        grid = Grid(0, height)  # no columns yet; _setCellDigits fills them in
+        grid.width = width
+        grid._setCellDigits(format(packed, '0%db' % (width * height))[::-1])
+        return grid
+    fromBytes = staticmethod(fromBytes)
+
+    def _cellDigits(self):
+        """
+        Returns the cells as a string of '0' and '1' in cell index order.
+        """
+        cells = b''.join([bytes(column) for column in self.data])
+        return cells.translate(_CELLS_TO_DIGITS).decode('ascii')
+
+    def _setCellDigits(self, digits):
+        """
+        Fills in data from a string of '0' and '1' in cell index order.
+        """
+        cells = memoryview(digits.encode('ascii').translate(_DIGITS_TO_CELLS)).cast('?')
+        height = self.height
+        self.data = [cells[x * height:(x + 1) * height].tolist()
+                     for x in range(self.width)]
+
     def _cellIndexToPosition(self, index):
-        x = index / self.height
+        x = index // self.height
         y = index % self.height
         return x, y
 
-    def _unpackBits(self, bits):
+    def _unpackBits(self, bits, initialValue=False):
         """
-        Fills in data from a bit-level representation
+        Fills in data from a bit-level representation; cells past the end of
+        bits are set to initialValue
         """
-        cell = 0
         for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height:
-                    break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
-        if packed < 0:
-            raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+            if packed < 0:
+                raise ValueError("must be a positive integer")
+        numCells = self.width * self.height
+        digits = ''.join([format(packed, '0%db' % self.CELLS_PER_INT) for packed in bits])
+        self._setCellDigits(digits[:numCells].ljust(numCells, '1' if initialValue else '0'))
+
+
+# Byte translation tables between cells stored as 0/1 bytes and '0'/'1' digits
+_CELLS_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_DIGITS_TO_CELLS = bytes.maketrans(b'01', b'\x00\x01')
 
 
 def reconstituteGrid(bitRep):
+    if type(bitRep) is bytes:
+        return Grid.fromBytes(bitRep)
     if type(bitRep) is not type((1, 2)):
         return bitRep
     width, height = bitRep[:2]
@@ -349,7 +378,23 @@ class Actions:
         return (dx * speed, dy * speed)
     directionToVector = staticmethod(directionToVector)
 
+    def getMoveTable(walls):
+        """
+        The MoveTable of a walls Grid.  Walls never change during a game, so
+        it is built on first use and kept on the Grid.
+        """
+        table = getattr(walls, 'moveTable', None)
+        if table == None:
+            table = MoveTable(walls)
+            walls.moveTable = table
+        return table
+    getMoveTable = staticmethod(getMoveTable)
+
     def getPossibleActions(config, walls):
+        actions = Actions.getMoveTable(walls).actions.get(config.pos)
+        if actions != None:
+            return list(actions)
+
         possible = []
         x, y = config.pos
         x_int, y_int = int(x + 0.5), int(y + 0.5)
@@ -370,6 +415,10 @@ class Actions:
     getPossibleActions = staticmethod(getPossibleActions)
 
     def getLegalNeighbors(position, walls):
+        neighbors = Actions.getMoveTable(walls).neighbors.get(position)
+        if neighbors != None:
+            return list(neighbors)
+
         x, y = position
         x_int, y_int = int(x + 0.5), int(y + 0.5)
         neighbors = []
@@ -393,6 +442,47 @@ class Actions:
     getSuccessor = staticmethod(getSuccessor)
 
 
+class MoveTable:
+    """
+    The legal moves from every open cell of a walls Grid, so that movement
+    rules look them up instead of testing walls:
+
+      actions[(x, y)]                 Actions.getPossibleActions on the cell
+      neighbors[(x, y)]               Actions.getLegalNeighbors of the cell
+      ghostActions[((x, y), facing)]  GhostRules.getLegalActions for a ghost
+                                      on the cell facing that direction
+
+    Cells on the edge of the grid are left out.  Positions between cells
+    (scared ghosts move half a cell at a time) are not in the table, and the
+    callers fall back to the arithmetic on them.
+    """
+
+    def __init__(self, walls):
+        self.actions = {}
+        self.neighbors = {}
+        self.ghostActions = {}
+        for x in range(1, walls.width - 1):
+            for y in range(1, walls.height - 1):
+                if walls[x][y]:
+                    continue
+                actions = []
+                neighbors = []
+                for direction, (dx, dy) in Actions._directionsAsList:
+                    if not walls[x + dx][y + dy]:
+                        actions.append(direction)
+                        neighbors.append((x + dx, y + dy))
+                self.actions[(x, y)] = tuple(actions)
+                self.neighbors[(x, y)] = tuple(neighbors)
+                moves = [action for action in actions if action != Directions.STOP]
+                for facing, vector in Actions._directionsAsList:
+                    reverse = Actions.reverseDirection(facing)
+                    if reverse in moves and len(moves) > 1:
+                        self.ghostActions[((x, y), facing)] = tuple(
+                            [action for action in moves if action != reverse])
+                    else:
+                        self.ghostActions[((x, y), facing)] = tuple(moves)
+
+
 class GameStateData:
 
     def __init__(self, prevState=None):
@@ -425,6 +515,31 @@ class GameStateData:
         state._capsuleEaten = self._capsuleEaten
         return state
 
+    def shallowCopy(self):
+        """
+        Returns a copy for successor generation that shares the food grid,
+        capsule list and AgentStates with this one.  Shared parts must be
+        replaced rather than changed in place: use copyAgentState before
+        changing an agent, and put a new food grid or capsule list on the
+        copy before editing either.
+        """
+        state = GameStateData()
+        state.food = self.food
+        state.capsules = self.capsules
+        state.agentStates = self.agentStates[:]
+        state.layout = self.layout
+        state._eaten = self._eaten
+        state.score = self.score
+        return state
+
+    def copyAgentState(self, agentIndex):
+        """
+        Gives this state its own copy of an agent's AgentState and returns it.
+        """
+        agentState = self.agentStates[agentIndex].copy()
+        self.agentStates[agentIndex] = agentState
+        return agentState
+
     def copyAgentStates(self, agentStates):
         copiedStates = []
         for agentState in agentStates:
@@ -545,12 +660,69 @@ except:
     _BOINC_ENABLED = False
 
 
+class GameInstrumentation:
+    """
+    Per-move timings gathered by Game.run from every game it is given to:
+    how long each agent took to choose its actions, and how long the engine
+    spent in each phase of a move:
+
+      observation - building the agent's observation (a deep copy, or the
+                    agent's observationFunction)
+      successor   - generating the next state
+      display     - updating the display
+      rules       - checking for the end of the game
+
+    Example:
+    instrumentation = GameInstrumentation()
+    game = rules.newGame(..., instrumentation=instrumentation)
+    game.run()
+    instrumentation.writeJSON('timings.json')
+    """
+    PHASES = ['observation', 'successor', 'display', 'rules']
+
+    def __init__(self):
+        self.games = 0
+        self.agentNames = {}
+        self.agentTimes = {}
+        self.phaseTimes = dict((phase, []) for phase in self.PHASES)
+
+    def startGame(self, agents):
+        self.games += 1
+        for index, agent in enumerate(agents):
+            self.agentNames[index] = agent.__class__.__name__
+            self.agentTimes.setdefault(index, [])
+
+    def summarize(self, samples):
+        "count, total, p50, p95 and max of a list of durations in seconds"
+        if not samples:
+            return {'count': 0, 'total': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+        ordered = sorted(samples)
+        def percentile(p):
+            return ordered[min(len(ordered) - 1, int(p * len(ordered)))]
+        return {'count': len(ordered), 'total': sum(ordered), 'p50': percentile(0.5),
+                'p95': percentile(0.95), 'max': ordered[-1]}
+
+    def toJSON(self):
+        agents = {}
+        for index, samples in self.agentTimes.items():
+            agents[str(index)] = self.summarize(samples)
+            agents[str(index)]['name'] = self.agentNames[index]
+        engine = dict((phase, self.summarize(self.phaseTimes[phase])) for phase in self.PHASES)
+        return {'games': self.games, 'agents': agents, 'engine': engine}
+
+    def writeJSON(self, path):
+        import json
+        with open(path, 'w') as f:
+            json.dump(self.toJSON(), f, indent=2)
+
+
 class Game:
     """
     The Game manages the control flow, soliciting actions from agents.
     """
 
-    def __init__(self, agents, display, rules, startingIndex=0, muteAgents=False, catchExceptions=False):
+    def __init__(self, agents, display, rules, startingIndex=0, muteAgents=False, catchExceptions=False,
+                 instrumentation=None):
         self.agentCrashed = False
         self.agents = agents
         self.display = display
@@ -563,6 +735,7 @@ class Game:
         self.totalAgentTimes = [0 for agent in agents]
         self.totalAgentTimeWarnings = [0 for agent in agents]
         self.agentTimeout = False
+        self.instrumentation = instrumentation
         import io
         self.agentOutput = [io.StringIO() for agent in agents]
 
@@ -625,7 +798,7 @@ class Game:
                 if self.catchExceptions:
                     try:
                         timed_func = TimeoutFunction(
-                            agent.registerInitialState, int(self.rules.getMaxStartupTime(i)))
+                            agent.registerInitialState, self.rules.getMaxStartupTime(i))
                         try:
                             start_time = time.time()
                             timed_func(self.state.deepCopy())
@@ -649,22 +822,38 @@ class Game:
 
         agentIndex = self.startingIndex
         numAgents = len(self.agents)
+        hasObservationFunction = ['observationFunction' in dir(agent) for agent in self.agents]
+        if self.catchExceptions:
+            # One TimeoutFunction per agent method, reused for every move
+            observationTimers = [TimeoutFunction(agent.observationFunction, 0) if hasObservation else None
+                                 for agent, hasObservation in zip(self.agents, hasObservationFunction)]
+            actionTimers = [TimeoutFunction(agent.getAction, 0) for agent in self.agents]
+
+        # Timings are only taken when there is somewhere to put them
+        instrumented = self.instrumentation != None
+        if instrumented:
+            clock = time.perf_counter
+            self.instrumentation.startGame(self.agents)
+            agentTimes = self.instrumentation.agentTimes
+            observationTimes, successorTimes, displayTimes, rulesTimes = [
+                self.instrumentation.phaseTimes[phase] for phase in GameInstrumentation.PHASES]
 
         while not self.gameOver:
             # Fetch the next agent
             agent = self.agents[agentIndex]
             move_time = 0
             skip_action = False
+            if instrumented:
+                phaseStart = clock()
             # Generate an observation of the state
-            if 'observationFunction' in dir(agent):
+            if hasObservationFunction[agentIndex]:
                 self.mute(agentIndex)
                 if self.catchExceptions:
                     try:
-                        timed_func = TimeoutFunction(agent.observationFunction, int(
-                            self.rules.getMoveTimeout(agentIndex)))
                         try:
                             start_time = time.time()
-                            observation = timed_func(self.state.deepCopy())
+                            observation = observationTimers[agentIndex].callWithin(
+                                self.rules.getMoveTimeout(agentIndex), self.state.deepCopy())
                         except TimeoutFunctionException:
                             skip_action = True
                         move_time += time.time() - start_time
@@ -679,19 +868,22 @@ class Game:
                 self.unmute()
             else:
                 observation = self.state.deepCopy()
+            if instrumented:
+                phaseEnd = clock()
+                observationTimes.append(phaseEnd - phaseStart)
+                phaseStart = phaseEnd
 
             # Solicit an action
             action = None
             self.mute(agentIndex)
             if self.catchExceptions:
                 try:
-                    timed_func = TimeoutFunction(agent.getAction, int(
-                        self.rules.getMoveTimeout(agentIndex)) - int(move_time))
                     try:
                         start_time = time.time()
                         if skip_action:
                             raise TimeoutFunctionException()
-                        action = timed_func(observation)
+                        action = actionTimers[agentIndex].callWithin(
+                            self.rules.getMoveTimeout(agentIndex) - move_time, observation)
                     except TimeoutFunctionException:
                         print("Agent %d timed out on a single move!" %
                               agentIndex, file=sys.stderr)
@@ -731,6 +923,10 @@ class Game:
             else:
                 action = agent.getAction(observation)
             self.unmute()
+            if instrumented:
+                phaseEnd = clock()
+                agentTimes[agentIndex].append(phaseEnd - phaseStart)
+                phaseStart = phaseEnd
 
             # Execute the action
             self.moveHistory.append((agentIndex, action))
@@ -745,14 +941,24 @@ class Game:
                     return
             else:
                 self.state = self.state.generateSuccessor(agentIndex, action)
+            if instrumented:
+                phaseEnd = clock()
+                successorTimes.append(phaseEnd - phaseStart)
+                phaseStart = phaseEnd
 
             # Change the display
             self.display.update(self.state.data)
             ###idx = agentIndex - agentIndex % 2 + 1
             ###self.display.update( self.state.makeObservation(idx).data )
+            if instrumented:
+                phaseEnd = clock()
+                displayTimes.append(phaseEnd - phaseStart)
+                phaseStart = phaseEnd
 
             # Allow for game specific conditions (winning, losing, etc.)
             self.rules.process(self.state, self)
+            if instrumented:
+                rulesTimes.append(clock() - phaseStart)
             # Track progress
             if agentIndex == numAgents + 1:
                 self.numMoves += 1
@@ -0,0 +1,263 @@
+# gameRecord.py
+# -------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A compact binary format for recorded games.  Any number of games can be
+appended to one file:
+
+  file     = MAGIC record*
+  record   = tag (1 byte) varint(length) payload
+  'L'      = sha1 of the layout text, layout text (utf-8)
+  'G'      = layout sha1, final score (double), win flag, number of ghosts,
+             snapshot interval, varint(moves) move*,
+             varint(snapshots) (varint(length) snapshot)*
+
+A layout is stored once per file and games refer to it by its hash.  A move
+is the single varint agentIndex * 5 + action, one byte for any normal game.
+Snapshot i is the state after (i + 1) * interval moves, so a replay can
+start from any move after replaying at most interval - 1 moves.
+
+Example:
+writer = GameRecordWriter('games.rec')
+writer.writeGame(game, initialState)
+writer.close()
+recorded = readGameRecords('games.rec')[0]
+state = recorded.stateAt(100, GameState)
+"""
+
+import hashlib
+import os
+import struct
+
+from game import Configuration, Directions, reconstituteGrid
+import layout
+
+MAGIC = b'PACREC\x01\n'
+ACTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+ACTION_INDEX = dict((action, i) for i, action in enumerate(ACTIONS))
+
+def isGameRecordFile(path):
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+def encodeVarint(value, out):
+    "Appends an unsigned LEB128 varint to the bytearray out"
+    while value >= 0x80:
+        out.append((value & 0x7f) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def decodeVarint(data, offset):
+    "Returns (value, offset after the varint)"
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+def layoutHash(lay):
+    return hashlib.sha1('\n'.join(lay.layoutText).encode('utf-8')).digest()
+
+def encodeSnapshot(state):
+    data = state.data
+    out = bytearray(struct.pack('<dB', data.score, data._win | (data._lose << 1)))
+    encodeVarint(len(data.agentStates), out)
+    for agentState in data.agentStates:
+        x, y = agentState.configuration.pos
+        # ghosts move half a cell at a time when scared
+        encodeVarint(int(round(x * 2)), out)
+        encodeVarint(int(round(y * 2)), out)
+        out.append(ACTION_INDEX[agentState.configuration.direction])
+        encodeVarint(agentState.scaredTimer, out)
+    encodeVarint(len(data.capsules), out)
+    for x, y in data.capsules:
+        encodeVarint(x, out)
+        encodeVarint(y, out)
+    food = data.food.toBytes()
+    encodeVarint(len(food), out)
+    out.extend(food)
+    return bytes(out)
+
+def decodeSnapshot(snapshot, state):
+    "Overwrites the changing parts of a freshly initialized state"
+    data = state.data
+    data.score, flags = struct.unpack_from('<dB', snapshot, 0)
+    data._win = bool(flags & 1)
+    data._lose = bool(flags & 2)
+    offset = struct.calcsize('<dB')
+    numAgents, offset = decodeVarint(snapshot, offset)
+    for agentState in data.agentStates[:numAgents]:
+        x, offset = decodeVarint(snapshot, offset)
+        y, offset = decodeVarint(snapshot, offset)
+        direction = ACTIONS[snapshot[offset]]
+        offset += 1
+        pos = (x // 2 if x % 2 == 0 else x / 2.0, y // 2 if y % 2 == 0 else y / 2.0)
+        agentState.configuration = Configuration(pos, direction)
+        agentState.scaredTimer, offset = decodeVarint(snapshot, offset)
+    numCapsules, offset = decodeVarint(snapshot, offset)
+    data.capsules = []
+    for i in range(numCapsules):
+        x, offset = decodeVarint(snapshot, offset)
+        y, offset = decodeVarint(snapshot, offset)
+        data.capsules.append((x, y))
+    length, offset = decodeVarint(snapshot, offset)
+    data.food = reconstituteGrid(snapshot[offset:offset + length])
+    return state
+
+class RecordedGame:
+    """
+    One game read from a record file.  moves is the list of (agentIndex,
+    action) pairs, as in Game.moveHistory.
+    """
+    def __init__(self, layout, numGhosts, moves, snapshotInterval, snapshots, score, win):
+        self.layout = layout
+        self.numGhosts = numGhosts
+        self.moves = moves
+        self.snapshotInterval = snapshotInterval
+        self.snapshots = snapshots
+        self.score = score
+        self.win = win
+
+    def initialState(self, stateClass):
+        state = stateClass()
+        state.initialize(self.layout, self.numGhosts)
+        return state
+
+    def stateAt(self, moveNumber, stateClass):
+        """
+        The state after the first moveNumber moves, built from the closest
+        snapshot before it.  stateClass is pacman.GameState.
+        """
+        moveNumber = max(0, min(moveNumber, len(self.moves)))
+        start = 0
+        state = self.initialState(stateClass)
+        if self.snapshotInterval > 0:
+            index = min(moveNumber // self.snapshotInterval, len(self.snapshots))
+            if index > 0:
+                decodeSnapshot(self.snapshots[index - 1], state)
+                start = index * self.snapshotInterval
+        for agentIndex, action in self.moves[start:moveNumber]:
+            state = state.generateSuccessor(agentIndex, action)
+        return state
+
+def readGameRecords(path):
+    "Returns the RecordedGames of a record file, in the order they were written"
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(MAGIC):
+        raise Exception('Not a game record file: ' + path)
+    layouts = {}
+    games = []
+    offset = len(MAGIC)
+    while offset < len(data):
+        tag = data[offset:offset + 1]
+        length, offset = decodeVarint(data, offset + 1)
+        payload = data[offset:offset + length]
+        offset += length
+        if tag == b'L':
+            layouts[payload[:20]] = layout.layoutFromText(payload[20:].decode('utf-8').split('\n'))
+        elif tag == b'G':
+            games.append(decodeGame(payload, layouts))
+        else:
+            raise Exception('Unknown record %r in %s' % (tag, path))
+    return games
+
+def decodeGame(payload, layouts):
+    lay = layouts[payload[:20]]
+    score, win = struct.unpack_from('<dB', payload, 20)
+    offset = 20 + struct.calcsize('<dB')
+    numGhosts, offset = decodeVarint(payload, offset)
+    snapshotInterval, offset = decodeVarint(payload, offset)
+    numMoves, offset = decodeVarint(payload, offset)
+    moves = []
+    for i in range(numMoves):
+        move, offset = decodeVarint(payload, offset)
+        moves.append((move // 5, ACTIONS[move % 5]))
+    numSnapshots, offset = decodeVarint(payload, offset)
+    snapshots = []
+    for i in range(numSnapshots):
+        length, offset = decodeVarint(payload, offset)
+        snapshots.append(payload[offset:offset + length])
+        offset += length
+    return RecordedGame(lay, numGhosts, moves, snapshotInterval, snapshots, score, bool(win))
+
+class GameRecordWriter:
+    "Appends games to a record file, creating it if needed"
+    def __init__(self, path, snapshotInterval=64):
+        self.snapshotInterval = snapshotInterval
+        self.layoutHashes = set()
+        if os.path.exists(path) and os.path.getsize(path) > 0:
+            with open(path, 'rb') as f:
+                data = f.read()
+            if not data.startswith(MAGIC):
+                raise Exception('Not a game record file: ' + path)
+            self.layoutHashes = self._storedLayouts(data)
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'wb')
+            self.file.write(MAGIC)
+
+    def _storedLayouts(self, data):
+        hashes = set()
+        offset = len(MAGIC)
+        while offset < len(data):
+            tag = data[offset:offset + 1]
+            length, offset = decodeVarint(data, offset + 1)
+            if tag == b'L':
+                hashes.add(data[offset:offset + 20])
+            offset += length
+        return hashes
+
+    def _writeRecord(self, tag, payload):
+        header = bytearray(tag)
+        encodeVarint(len(payload), header)
+        self.file.write(bytes(header))
+        self.file.write(payload)
+
+    def writeGame(self, game, initialState):
+        """
+        Appends a finished game.  initialState is the state the game started
+        from; the game is played again from it to take the snapshots.
+        """
+        lay = initialState.data.layout
+        key = layoutHash(lay)
+        if key not in self.layoutHashes:
+            self._writeRecord(b'L', key + '\n'.join(lay.layoutText).encode('utf-8'))
+            self.layoutHashes.add(key)
+
+        payload = bytearray(key)
+        payload.extend(struct.pack('<dB', game.state.getScore(), game.state.isWin()))
+        encodeVarint(initialState.getNumAgents() - 1, payload)
+        encodeVarint(self.snapshotInterval, payload)
+        encodeVarint(len(game.moveHistory), payload)
+        snapshots = []
+        state = initialState
+        for i, (agentIndex, action) in enumerate(game.moveHistory):
+            encodeVarint(agentIndex * 5 + ACTION_INDEX[action], payload)
+            state = state.generateSuccessor(agentIndex, action)
+            if self.snapshotInterval > 0 and (i + 1) % self.snapshotInterval == 0:
+                snapshots.append(encodeSnapshot(state))
+        encodeVarint(len(snapshots), payload)
+        for snapshot in snapshots:
+            encodeVarint(len(snapshot), payload)
+            payload.extend(snapshot)
+        self._writeRecord(b'G', bytes(payload))
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
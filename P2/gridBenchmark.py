@@ -0,0 +1,103 @@
+# gridBenchmark.py
+# ----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Checks and times the compact Grid codecs in game.py.
+
+Before timing anything, random grids of many shapes and densities are
+round-tripped through packBits/reconstituteGrid and toBytes/fromBytes and
+compared with the original.  The codecs are then timed on the food and wall
+grids of the largest layouts, with pickle as a point of reference.
+
+> python gridBenchmark.py
+"""
+
+import os
+import pickle
+import random
+import sys
+import time
+
+import layout
+from game import Grid, reconstituteGrid
+
+def randomGrid(rand, width, height, density):
+    grid = Grid(width, height)
+    for x in range(width):
+        for y in range(height):
+            grid[x][y] = rand.random() < density
+    return grid
+
+def checkRoundTrips(trials, seed=0):
+    """
+    Round-trips random grids through every codec; raises if any differ.
+    """
+    rand = random.Random(seed)
+    for i in range(trials):
+        grid = randomGrid(rand, rand.randint(0, 64), rand.randint(0, 64), rand.random())
+        for encoded in [grid.packBits(), grid.toBytes()]:
+            decoded = reconstituteGrid(encoded)
+            if (decoded.width, decoded.height) != (grid.width, grid.height) or decoded != grid:
+                raise Exception('Round trip failed for a %dx%d grid:\n%s' % (grid.width, grid.height, grid))
+
+def timeCodec(encode, decode, grid, seconds):
+    "Returns (round trips per second, encoded size in bytes)"
+    encoded = encode(grid)
+    size = len(encoded) if isinstance(encoded, bytes) else len(pickle.dumps(encoded, pickle.HIGHEST_PROTOCOL))
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        for i in range(100):
+            decode(encode(grid))
+        count += 100
+    return count / (time.perf_counter() - start), size
+
+CODECS = [
+    ('packBits', lambda g: g.packBits(), reconstituteGrid),
+    ('toBytes', lambda g: g.toBytes(), reconstituteGrid),
+    ('pickle', lambda g: pickle.dumps(g, pickle.HIGHEST_PROTOCOL), pickle.loads),
+]
+
+def largestLayouts(count):
+    names = [f[:-4] for f in os.listdir('layouts') if f.endswith('.lay')]
+    layouts = [(name, layout.getLayout(name)) for name in names]
+    layouts.sort(key=lambda item: -item[1].width * item[1].height)
+    return layouts[:count]
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python gridBenchmark.py <options>')
+    parser.add_option('-n', '--numLayouts', dest='numLayouts', type='int', default=3,
+                      help='How many of the largest layouts to time [Default: %default]')
+    parser.add_option('-t', '--trials', dest='trials', type='int', default=2000,
+                      help='Random grids to round-trip before timing [Default: %default]')
+    parser.add_option('-s', '--seconds', dest='seconds', type='float', default=0.5,
+                      help='Time spent on each codec and grid [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    checkRoundTrips(options.trials)
+    print('Round trips OK for %d random grids' % options.trials)
+
+    print('%-22s %-6s %-9s %14s %8s' % ('layout', 'grid', 'codec', 'round trips/s', 'bytes'))
+    for name, lay in largestLayouts(options.numLayouts):
+        for gridName, grid in [('food', lay.food), ('walls', lay.walls)]:
+            for codecName, encode, decode in CODECS:
+                rate, size = timeCodec(encode, decode, grid, options.seconds)
+                print('%-22s %-6s %-9s %14.0f %8d' % ('%s (%dx%d)' % (name, lay.width, lay.height),
+                                                       gridName, codecName, rate, size))
@@ -0,0 +1,143 @@
+# multiAgentBenchmark.py
+# ----------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Measures how fast the multi-agent search machinery runs.
+
+  successors:  walks the full game tree from the start of a layout to a
+               fixed depth (one depth = every agent moves once) and reports
+               generated successors per second.
+  expectimax:  times ExpectimaxAgent's original search against its chance
+               node engine, with uniform and directional ghost models, on
+               the positions of a short seeded game on each layout.
+
+> python multiAgentBenchmark.py -l mediumClassic -d 3,4
+> python multiAgentBenchmark.py -b expectimax -l all -d 2
+"""
+
+import os
+import random
+import sys
+import time
+
+import layout
+import multiAgents
+import pacman
+
+def startState(layoutName, numGhosts=4):
+    lay = layout.getLayout(layoutName)
+    if lay == None: raise Exception("The layout " + layoutName + " cannot be found")
+    state = pacman.GameState()
+    state.initialize(lay, numGhosts)
+    return state
+
+def countSuccessors(state, depth):
+    """
+    Generates every successor to the given depth and returns how many there
+    were.
+    """
+    numAgents = state.getNumAgents()
+    def expand(state, ply):
+        if ply == depth * numAgents or state.isWin() or state.isLose():
+            return 0
+        agentIndex = ply % numAgents
+        count = 0
+        for action in state.getLegalActions(agentIndex):
+            count += 1 + expand(state.generateSuccessor(agentIndex, action), ply + 1)
+        return count
+    return expand(state, 0)
+
+def benchmarkSuccessors(layoutName, depths):
+    print('%-16s %6s %12s %9s %14s' % ('layout', 'depth', 'successors', 'seconds', 'successors/s'))
+    for depth in depths:
+        state = startState(layoutName)
+        pacman.GameState.getAndResetExplored()
+        start = time.perf_counter()
+        count = countSuccessors(state, depth)
+        elapsed = time.perf_counter() - start
+        pacman.GameState.getAndResetExplored()
+        print('%-16s %6d %12d %9.3f %14.0f' % (layoutName, depth, count, elapsed, count / elapsed))
+
+def gamePositions(layoutName, moves, seed=0):
+    """
+    The states Pacman moves from in a short game where every agent picks
+    random moves from a fixed seed.
+    """
+    rand = random.Random(seed)
+    state = startState(layoutName)
+    positions = []
+    while len(positions) < moves and not (state.isWin() or state.isLose()):
+        positions.append(state)
+        for agentIndex in range(state.getNumAgents()):
+            if state.isWin() or state.isLose(): break
+            state = state.generateSuccessor(agentIndex, rand.choice(state.getLegalActions(agentIndex)))
+    return positions
+
+# (name, ExpectimaxAgent keyword arguments)
+EXPECTIMAX_ENGINES = [
+    ('original', {}),
+    ('chance', {'memoize': 'True'}),
+    ('directional', {'ghostModel': 'DirectionalGhost'}),
+]
+
+def benchmarkExpectimax(layoutNames, depths, moves):
+    print('%-16s %6s %-12s %9s %12s %8s' % ('layout', 'depth', 'engine', 'seconds', 'successors', 'agree'))
+    for layoutName in layoutNames:
+        positions = gamePositions(layoutName, moves)
+        for depth in depths:
+            originalActions = None
+            for name, args in EXPECTIMAX_ENGINES:
+                agent = multiAgents.ExpectimaxAgent(depth=str(depth), **args)
+                agent.registerInitialState(positions[0])
+                pacman.GameState.setExploredTracking('count')
+                start = time.perf_counter()
+                actions = [agent.getAction(state) for state in positions]
+                elapsed = time.perf_counter() - start
+                successors = pacman.GameState.getAndResetExploredCount()
+                pacman.GameState.setExploredTracking(None)
+                if originalActions == None: originalActions = actions
+                agree = sum([a == b for a, b in zip(actions, originalActions)])
+                print('%-16s %6d %-12s %9.3f %12d %5d/%-2d' % (layoutName, depth, name, elapsed,
+                                                             successors, agree, len(actions)))
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python multiAgentBenchmark.py <options>')
+    parser.add_option('-b', '--benchmark', dest='benchmark', default='successors',
+                      help='successors or expectimax [Default: %default]')
+    parser.add_option('-l', '--layout', dest='layout', default='mediumClassic',
+                      help='Comma separated layouts, or all [Default: %default]')
+    parser.add_option('-d', '--depths', dest='depths', default='3,4',
+                      help='Comma separated search depths [Default: %default]')
+    parser.add_option('-m', '--moves', dest='moves', type='int', default=5,
+                      help='Positions per layout for the expectimax benchmark [Default: %default]')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    if options.benchmark not in ['successors', 'expectimax']:
+        raise Exception('Unknown benchmark: ' + options.benchmark)
+    options.depths = [int(d) for d in options.depths.split(',')]
+    if options.layout == 'all':
+        options.layouts = sorted([f[:-4] for f in os.listdir('layouts') if f.endswith('.lay')])
+    else:
+        options.layouts = options.layout.split(',')
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    if options.benchmark == 'successors':
+        for layoutName in options.layouts:
+            benchmarkSuccessors(layoutName, options.depths)
+    else:
+        benchmarkExpectimax(options.layouts, options.depths, options.moves)
@@ -1,8 +1,13 @@
 from util import manhattanDistance
 from game import Directions
-import random, util
+import math, random, time, util
+from array import array
 
 from game import Agent
+from transpositionTable import TranspositionTable, ZobristHasher, EXACT, LOWER, UPPER
+import ghostAgents
+import mazeDistances
+import parallelSearch
 
 class ReflexAgent(Agent):
     """
@@ -99,10 +104,43 @@ class MultiAgentSearchAgent(Agent):
     is another abstract class.
     """
 
-    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2'):
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', workers = '0'):
         self.index = 0 # Pacman is always agent index 0
         self.evaluationFunction = util.lookup(evalFn, globals())
         self.depth = int(depth)
+        # Optional transposition table (see transpositionTable.py); off unless
+        # a size is given, e.g. -a tableSize=65536
+        self.table = None
+        if int(tableSize) > 0:
+            self.table = TranspositionTable(int(tableSize))
+        # Worker processes for the root of the search (see parallelSearch.py);
+        # 0 searches in this process
+        self.workers = int(workers)
+
+    def ply_value(self, state, ply):
+        """
+        The value of a state reached ply agent moves below the root of the
+        current search.  Used by parallelSearch to search split subtrees.
+        """
+        util.raiseNotDefined()
+
+    def ghost_value(self, state, values):
+        """
+        Combines the values of a ghost's successors (in legal action order)
+        into the value of the ghost's node.
+        """
+        util.raiseNotDefined()
+
+    def registerInitialState(self, gameState):
+        if self.table != None:
+            self.table.clear()
+            self.table.resetStats()
+
+    def final(self, gameState):
+        if self.table != None:
+            stats = self.table.getStats()
+            print('Transposition table: %d hits, %d misses (%.1f%% hit rate), %d stores' %
+                  (stats['hits'], stats['misses'], 100 * stats['hitRate'], stats['stores']))
 
 class MinimaxAgent(MultiAgentSearchAgent):
     """
@@ -133,47 +171,119 @@ class MinimaxAgent(MultiAgentSearchAgent):
         Returns whether or not the game state is a losing state
         """
         "*** YOUR CODE HERE ***"
-        
-        def pac_helper(state, depth, agentIndex):
-            agent_num = state.getNumAgents()
-            if agentIndex==agent_num: # pacman
-                if gameState.isWin() or gameState.isLose() or depth == self.depth:
-                    # it has reaches the final state
-                    return self.evaluationFunction(state)
-                else:
-                    return pac_helper(state, depth+1, 0)
-            else:
-                legal_action = state.getLegalActions(agentIndex)
-                successor=[]
-                if len(legal_action)==0:
-                    # no legal action, return the eva. value
-                    return self.evaluationFunction(state)
-                for actions in legal_action:
-                    # for each legal action, append the successor value
-                    successor.append(pac_helper(state.generateSuccessor(agentIndex, actions)
-                                                ,depth, agentIndex + 1))
-                # choose max/min
-                if(agentIndex==0):  # the pacman's move, choose the maxvalue
-                    return max(successor)
-                else: # else choose minvalue
-                    return min(successor)
+        if self.table != None:
+            self.table.newSearch()
         pac_action=gameState.getLegalActions(0)
-        return max(pac_action,
-                   key=lambda k:pac_helper(gameState.generateSuccessor(0, k), 1, 1))
-   
-        
-        util.raiseNotDefined()
+        if self.workers > 0:
+            values = parallelSearch.rootValues(self, gameState, pac_action)
+        else:
+            values = [self.pac_helper(gameState.generateSuccessor(0, k), 1, 1) for k in pac_action]
+        # the first best action, as max(pac_action, key=...) picks
+        return pac_action[values.index(max(values))]
+
+    def ply_value(self, state, ply):
+        agent_num = state.getNumAgents()
+        return self.pac_helper(state, (ply - 1) // agent_num + 1, (ply - 1) % agent_num + 1)
+
+    def ghost_value(self, state, values):
+        return min(values)
+
+    def pac_helper(self, state, depth, agentIndex):
+        agent_num = state.getNumAgents()
+        if agentIndex==agent_num: # pacman
+            if depth == self.depth:
+                # it has reaches the final state
+                return self.evaluationFunction(state)
+            else:
+                return self.pac_helper(state, depth+1, 0)
+        elif self.table != None:
+            # the value only depends on the state, the agent to move and
+            # how many rounds are left below it
+            key, entry = self.table.lookup(state, agentIndex, self.depth - depth)
+            if entry != None:
+                return entry[0]
+            value = self.min_max_value(state, depth, agentIndex)
+            self.table.store(key, self.depth - depth, value)
+            return value
+        else:
+            return self.min_max_value(state, depth, agentIndex)
+
+    def min_max_value(self, state, depth, agentIndex):
+        legal_action = state.getLegalActions(agentIndex)
+        successor=[]
+        if len(legal_action)==0:
+            # no legal action, return the eva. value
+            return self.evaluationFunction(state)
+        for actions in legal_action:
+            # for each legal action, append the successor value
+            successor.append(self.pac_helper(state.generateSuccessor(agentIndex, actions)
+                                             ,depth, agentIndex + 1))
+        # choose max/min
+        if(agentIndex==0):  # the pacman's move, choose the maxvalue
+            return max(successor)
+        else: # else choose minvalue
+            return min(successor)
+
+class SearchTimeout(Exception):
+    "Raised inside an anytime search when its time budget has run out"
+    pass
+
+def moveDeadline(start, budget):
+    """
+    When an anytime search started at start (on the time.monotonic clock,
+    as util.Deadline) should stop: after budget seconds, or sooner if the
+    game's move timeout (util.currentDeadline) would cut it off first.  A
+    tenth of the time the game allows is kept back for returning the action.
+    """
+    deadline = start + budget
+    gameDeadline = util.currentDeadline()
+    if gameDeadline != None:
+        deadline = min(deadline, start + 0.9 * (gameDeadline.end - start))
+    return deadline
 
 class AlphaBetaAgent(MultiAgentSearchAgent):
     """
     Your minimax agent with alpha-beta pruning (question 3)
+
+    With a timeFraction (e.g. -a timeFraction=0.02) the agent ignores depth
+    and deepens iteratively for that fraction of the game's move warning
+    time instead.
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', workers = '0',
+                 timeFraction = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize, workers)
+        self.timeFraction = float(timeFraction)
+        # ClassicGameRules' default timeout, until the rules tell us otherwise
+        self.moveWarningTime = 30
+        self.depthsReached = []
+
+    def setMoveWarningTime(self, seconds):
+        "Called by ClassicGameRules.newGame"
+        self.moveWarningTime = seconds
+
+    def registerInitialState(self, gameState):
+        MultiAgentSearchAgent.registerInitialState(self, gameState)
+        self.depthsReached = []
+
+    def final(self, gameState):
+        MultiAgentSearchAgent.final(self, gameState)
+        if self.depthsReached:
+            print('Search depth per move: %s (average %.2f)' %
+                  (' '.join([str(d) for d in self.depthsReached]),
+                   sum(self.depthsReached) / float(len(self.depthsReached))))
+
     def getAction(self, gameState):
         """
         Returns the minimax action using self.depth and self.evaluationFunction
         """
         "*** YOUR CODE HERE ***"
+        if self.timeFraction > 0:
+            return self.anytime_action(gameState)
+        if self.table != None:
+            self.table.newSearch()
+        if self.workers > 0:
+            return parallelSearch.alphaBetaRootAction(self, gameState)
         # the initial alpha is -inf, and initial beta is inf
         result=self.ab_main(float('-inf'), float('inf'),gameState,0)
         # return the action result[0]
@@ -223,6 +333,8 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
         if state.isWin() or state.isLose() or depth == self.depth*agent_num:
             # reaches the end state
             return (None, self.evaluationFunction(state))
+        if self.table != None:
+            return self.ab_table(alpha, beta, state, depth)
         if depth%agent_num != 0: 
             # the ghost step, do min-value
             return self.min_value(alpha, beta,state,depth)
@@ -230,11 +342,157 @@ class AlphaBetaAgent(MultiAgentSearchAgent):
             return self.max_value(alpha,beta,state, depth)
         util.raiseNotDefined()
 
+    def anytime_action(self, gameState):
+        """
+        Iterative deepening: searches 1, 2, ... rounds deep until the time
+        budget runs out, and returns the best action of the deepest search
+        that finished.  Each search tries moves in the order suggested by the
+        one before it: the principal variation first, then killer moves
+        (moves that caused a cutoff at the same ply), then moves by history
+        score (how often and how deep they caused cutoffs).
+        """
+        start = time.monotonic()
+        self.deadline = moveDeadline(start, self.timeFraction * self.moveWarningTime)
+        self.nodes = 0
+        self.killers = {}
+        self.history = util.Counter()
+        self.pv = []
+        agent_num = gameState.getNumAgents()
+        action = None
+        depth = 0
+        while True:
+            self.horizonReached = False
+            try:
+                value, line = self.ab_ordered(float('-inf'), float('inf'), gameState,
+                                              0, (depth + 1) * agent_num, True)
+            except SearchTimeout:
+                break
+            depth += 1
+            action = line[0]
+            self.pv = line
+            # stop once the whole game tree fits, or when the next, deeper
+            # search is unlikely to finish
+            if not self.horizonReached or time.monotonic() - start > (self.deadline - start) / 2:
+                break
+        self.depthsReached.append(depth)
+        return action
+
+    def ab_ordered(self, alpha, beta, state, ply, maxPly, onPV):
+        """
+        Alpha-beta with move ordering, pruning the same way as max_value and
+        min_value.  Returns (value, line) where line is the best sequence of
+        actions found from this state.
+        """
+        if state.isWin() or state.isLose():
+            return self.evaluationFunction(state), []
+        if ply == maxPly:
+            self.horizonReached = True
+            return self.evaluationFunction(state), []
+        self.nodes += 1
+        # the first search always finishes so that there is an action to play
+        if maxPly > state.getNumAgents() and self.nodes % 256 == 0 and time.monotonic() > self.deadline:
+            raise SearchTimeout()
+
+        agentIndex = ply % state.getNumAgents()
+        legal_action = state.getLegalActions(agentIndex)
+        if len(legal_action) == 0:
+            return self.evaluationFunction(state), []
+        pvAction = self.pv[ply] if onPV and ply < len(self.pv) else None
+        maximizing = agentIndex == 0
+        v = (float('-inf') if maximizing else float('inf'), [])
+        for action in self.order_actions(legal_action, agentIndex, ply, pvAction):
+            successor = state.generateSuccessor(agentIndex, action)
+            suc_v = self.ab_ordered(alpha, beta, successor, ply + 1, maxPly,
+                                    onPV and action == pvAction)
+            if (maximizing and suc_v[0] > v[0]) or (not maximizing and suc_v[0] < v[0]):
+                v = (suc_v[0], [action] + suc_v[1])
+            if (maximizing and v[0] > beta) or (not maximizing and v[0] < alpha):
+                self.record_cutoff(action, agentIndex, ply, maxPly)
+                return v
+            if maximizing:
+                alpha = max(v[0], alpha)
+            else:
+                beta = min(v[0], beta)
+        return v
+
+    def order_actions(self, legal_action, agentIndex, ply, pvAction):
+        killers = self.killers.get(ply, [])
+        def priority(action):
+            if action == pvAction:
+                return (0, 0)
+            if action in killers:
+                return (1, killers.index(action))
+            return (2, -self.history[(agentIndex, action)])
+        return sorted(legal_action, key=priority)
+
+    def record_cutoff(self, action, agentIndex, ply, maxPly):
+        killers = self.killers.setdefault(ply, [])
+        if action not in killers:
+            killers.insert(0, action)
+            del killers[2:]
+        self.history[(agentIndex, action)] += (maxPly - ply) ** 2
+
+    def ab_table(self, alpha, beta, state, depth):
+        """
+        ab_main through the transposition table.  A value outside the
+        (alpha, beta) window is only a bound on the true value, and is
+        stored as one.
+        """
+        agent_num = state.getNumAgents()
+        remaining = self.depth*agent_num - depth
+        key, entry = self.table.lookup(state, depth%agent_num, remaining, alpha, beta)
+        if entry != None:
+            return (entry[2], entry[0])
+        if depth%agent_num != 0:
+            v = self.min_value(alpha, beta, state, depth)
+        else:
+            v = self.max_value(alpha, beta, state, depth)
+        if v[1] < alpha:
+            bound = UPPER
+        elif v[1] > beta:
+            bound = LOWER
+        else:
+            bound = EXACT
+        self.table.store(key, remaining, v[1], bound, v[0])
+        return v
+
 class ExpectimaxAgent(MultiAgentSearchAgent):
     """
       Your expectimax agent (question 4)
+
+      With a ghostModel (e.g. -a ghostModel=DirectionalGhost, or uniform) the
+      agent uses the chance node engine of chance_action instead, which also
+      runs when memoize=True.  With stats=True the engine's node counts are
+      printed at the end of each game.
     """
 
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', workers = '0',
+                 ghostModel = None, memoize = 'False', memoSize = '262144', stats = 'False'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize, workers)
+        self.ghostModel = ghostModel
+        self.useChanceEngine = ghostModel != None or memoize == 'True'
+        self.printStats = stats == 'True'
+        self.memoSize = int(memoSize)
+        self.ghostModels = {}
+        self.hasher = ZobristHasher()
+        self.memo = {}
+        self.resetChanceStats()
+
+    def resetChanceStats(self):
+        self.chanceSearched = 0
+        self.chanceMemoHits = 0
+
+    def registerInitialState(self, gameState):
+        MultiAgentSearchAgent.registerInitialState(self, gameState)
+        self.memo = {}
+        self.resetChanceStats()
+
+    def final(self, gameState):
+        MultiAgentSearchAgent.final(self, gameState)
+        if self.useChanceEngine and self.printStats:
+            print('Chance nodes: %d searched, %d from memo' %
+                  (self.chanceSearched, self.chanceMemoHits))
+
     def getAction(self, gameState):
         """
         Returns the expectimax action using self.depth and self.evaluationFunction
@@ -243,38 +501,356 @@ class ExpectimaxAgent(MultiAgentSearchAgent):
         legal moves.
         """
         "*** YOUR CODE HERE ***"
-        agent_num=gameState.getNumAgents()
+        if self.useChanceEngine:
+            return self.chance_action(gameState)
         v_tot=util.Counter()
         legal_action=gameState.getLegalActions(0)
-        def expectimax(state,depth,agentIndex):   
-            if state.isWin() or state.isLose() or depth==0: 
-                # the end state, use evaluate func
-                return self.evaluationFunction(state)
-            v=-float('inf')
-            s=0.00 # average value
-            for actions in state.getLegalActions(agentIndex):
-                if (agentIndex==0):
-                    # pacman state, use max-value
-                    v=max(v,expectimax(state.generateSuccessor(agentIndex,actions),
-                                       depth,agentIndex+1))
-                else:
-                    # ghost state
-                    ghost_num=len(state.getLegalActions(agentIndex))
-                    if(agentIndex<agent_num-1):
-                        # not the last ghost
-                        s=s+expectimax(state.generateSuccessor(agentIndex,actions),
-                                           depth,agentIndex+1)
-                    else:
-                        # end of ghost, agent Index go to pacman again
-                        s=s+expectimax(state.generateSuccessor(agentIndex,actions),
-                                           depth-1,0)
-                    v=s/ghost_num # calculate avg
+        if self.table != None:
+            self.table.newSearch()
+        if self.workers > 0:
+            values = parallelSearch.rootValues(self, gameState, legal_action)
+        else:
+            values = [self.expectimax(gameState.generateSuccessor(0,actions),self.depth,1)
+                      for actions in legal_action]
+        for i in range(len(legal_action)):
+            v_tot[i]=values[i]
+        return legal_action[v_tot.argMax()]
+
+    def ply_value(self, state, ply):
+        agent_num = state.getNumAgents()
+        return self.expectimax(state, self.depth - ply // agent_num, ply % agent_num)
+
+    def ghost_value(self, state, values):
+        # summed in the same order as expectimax_value so the result is
+        # the same to the last bit
+        s=0.00
+        for value in values:
+            s=s+value
+        return s/len(values)
+
+    def expectimax(self,state,depth,agentIndex):
+        if state.isWin() or state.isLose() or depth==0: 
+            # the end state, use evaluate func
+            return self.evaluationFunction(state)
+        if self.table != None:
+            key, entry = self.table.lookup(state, agentIndex, depth)
+            if entry != None:
+                return entry[0]
+            v = self.expectimax_value(state, depth, agentIndex)
+            self.table.store(key, depth, v)
             return v
+        return self.expectimax_value(state, depth, agentIndex)
+
+    def expectimax_value(self, state, depth, agentIndex):
+        agent_num=state.getNumAgents()
+        v=-float('inf')
+        s=0.00 # average value
+        legal_action = state.getLegalActions(agentIndex)
+        ghost_num=len(legal_action)
         for actions in legal_action:
-            i=legal_action.index(actions)
-            v_tot[i]=expectimax(gameState.generateSuccessor(0,actions),self.depth,1)
-        return legal_action[v_tot.argMax()]
-        util.raiseNotDefined()
+            if (agentIndex==0):
+                # pacman state, use max-value
+                v=max(v,self.expectimax(state.generateSuccessor(agentIndex,actions),
+                                        depth,agentIndex+1))
+            else:
+                # ghost state
+                if(agentIndex<agent_num-1):
+                    # not the last ghost
+                    s=s+self.expectimax(state.generateSuccessor(agentIndex,actions),
+                                        depth,agentIndex+1)
+                else:
+                    # end of ghost, agent Index go to pacman again
+                    s=s+self.expectimax(state.generateSuccessor(agentIndex,actions),
+                                        depth-1,0)
+                v=s/ghost_num # calculate avg
+        return v
+
+    def chance_action(self, gameState):
+        """
+        Expectimax where every ghost moves according to self.ghostModel:
+        uniformly at random (the default, as in expectimax), or with the
+        getDistribution of a ghost agent class from ghostAgents.py.
+
+        Chance node values are remembered per (state, agent to move, depth)
+        for the rest of the game; the memo is emptied whenever it would grow
+        past memoSize entries.
+        """
+        legal_action = gameState.getLegalActions(0)
+        values = [self.chance_value(gameState.generateSuccessor(0, action), self.depth, 1)
+                  for action in legal_action]
+        return legal_action[values.index(max(values))]
+
+    def ghost_distribution(self, state, agentIndex):
+        "Returns (action, probability) pairs for a ghost's next move"
+        if self.ghostModel == None or self.ghostModel == 'uniform':
+            legal_action = state.getLegalActions(agentIndex)
+            return [(action, 1.0 / len(legal_action)) for action in legal_action]
+        if agentIndex not in self.ghostModels:
+            self.ghostModels[agentIndex] = getattr(ghostAgents, self.ghostModel)(agentIndex)
+        return list(self.ghostModels[agentIndex].getDistribution(state).items())
+
+    def chance_value(self, state, depth, agentIndex):
+        if state.isWin() or state.isLose() or depth == 0:
+            return self.evaluationFunction(state)
+        agent_num = state.getNumAgents()
+        nextIndex = (agentIndex + 1) % agent_num
+        nextDepth = depth - 1 if nextIndex == 0 else depth
+        if agentIndex == 0:
+            return max([self.chance_value(state.generateSuccessor(0, action), nextDepth, nextIndex)
+                        for action in state.getLegalActions(0)])
+
+        key = self.hasher.hash(state, agentIndex, depth)
+        if key in self.memo:
+            self.chanceMemoHits += 1
+            return self.memo[key]
+        self.chanceSearched += 1
+        v = 0.0
+        for action, probability in self.ghost_distribution(state, agentIndex):
+            if probability > 0:
+                v += probability * self.chance_value(state.generateSuccessor(agentIndex, action),
+                                                     nextDepth, nextIndex)
+        if len(self.memo) >= self.memoSize:
+            self.memo = {}
+        self.memo[key] = v
+        return v
+
+class MCTSNode:
+    "A state where Pacman is to move in MCTSAgent's search tree"
+    __slots__ = ('state', 'edges', 'untried')
+
+    def __init__(self, state):
+        self.state = state
+        self.edges = {}      # Pacman action -> MCTSEdge
+        self.untried = None  # legal actions without an edge, set on the first visit
+
+class MCTSEdge:
+    "A Pacman action out of an MCTSNode, and the positions the ghosts' replies led to"
+    __slots__ = ('visits', 'total', 'outcomes')
+
+    def __init__(self):
+        self.visits = 0
+        self.total = 0.0
+        self.outcomes = {}   # tuple of ghost actions -> MCTSNode
+
+class MCTSAgent(MultiAgentSearchAgent):
+    """
+    Monte Carlo tree search with UCT.  Each playout walks down the tree,
+    picking Pacman's actions by UCB1 and sampling the ghosts' replies from
+    ghostModel (RandomGhost or DirectionalGhost), adds one node, and plays
+    on with random Pacman moves for rolloutDepth rounds.  The leaf is scored
+    with the evaluation function.
+
+    The search runs for timeFraction of the move warning time, or for a
+    fixed number of playouts.  The subtree of the position the game actually
+    reached is kept for the next move.  With workers, that many processes
+    search fresh trees from the same position at the same time, and their
+    root visit counts are added to ours.
+
+    > python pacman.py -p MCTSAgent -a timeFraction=0.01,ghostModel=DirectionalGhost
+    """
+
+    def __init__(self, evalFn = 'scoreEvaluationFunction', depth = '2', tableSize = '0', workers = '0',
+                 timeFraction = '0.01', playouts = '0', rolloutDepth = '10', exploration = '1.0',
+                 ghostModel = 'RandomGhost', seed = '0'):
+        MultiAgentSearchAgent.__init__(self, evalFn, depth, tableSize, workers)
+        self.timeFraction = float(timeFraction)
+        self.maxPlayouts = int(playouts)
+        self.rolloutDepth = int(rolloutDepth)
+        self.exploration = float(exploration)
+        self.ghostModel = ghostModel
+        self.ghostModels = {}
+        self.random = random.Random(int(seed))
+        # passed on to the copies of this agent that run in worker processes
+        self.workerArgs = {'playouts': playouts, 'rolloutDepth': rolloutDepth,
+                           'exploration': exploration, 'ghostModel': ghostModel}
+        # ClassicGameRules' default timeout, until the rules tell us otherwise
+        self.moveWarningTime = 30
+        self.root = None
+        self.lastAction = None
+        self.moveStats = []
+
+    def setMoveWarningTime(self, seconds):
+        "Called by ClassicGameRules.newGame"
+        self.moveWarningTime = seconds
+
+    def registerInitialState(self, gameState):
+        MultiAgentSearchAgent.registerInitialState(self, gameState)
+        self.root = None
+        self.lastAction = None
+        self.moveStats = []
+
+    def final(self, gameState):
+        MultiAgentSearchAgent.final(self, gameState)
+        if self.moveStats:
+            playouts = sum([stats['playouts'] for stats in self.moveStats])
+            seconds = sum([stats['seconds'] for stats in self.moveStats])
+            sizes = [stats['treeSize'] for stats in self.moveStats]
+            reused = len([stats for stats in self.moveStats if stats['reused'] > 0])
+            print('MCTS: %d moves, %d playouts (%.0f/s), tree size %.0f average, %d largest, '
+                  '%d trees reused' % (len(self.moveStats), playouts, playouts / max(seconds, 1e-9),
+                                       sum(sizes) / float(len(sizes)), max(sizes), reused))
+
+    def getAction(self, gameState):
+        start = time.monotonic()
+        deadline = moveDeadline(start, self.timeFraction * self.moveWarningTime)
+        root = self.reuse_subtree(gameState)
+        reused = self.tree_size(root) - 1 if root != None else 0
+        if root == None:
+            root = MCTSNode(gameState)
+        self.treeSize = reused + 1
+
+        futures = []
+        if self.workers > 0:
+            pool = parallelSearch.getPool(self.workers)
+            spec = parallelSearch.agentSpec(self)
+            packed = parallelSearch.packState(gameState)
+            futures = [pool.submit(parallelSearch.mctsTask, spec, packed, deadline,
+                                   self.random.getrandbits(32))
+                       for i in range(self.workers)]
+
+        self.low, self.high = float('inf'), float('-inf')
+        playouts = self.search(root, deadline)
+        visits = dict((action, [edge.visits, edge.total]) for action, edge in root.edges.items())
+        for future in futures:
+            rootVisits, workerPlayouts = future.result()
+            playouts += workerPlayouts
+            for action, (count, total) in rootVisits.items():
+                if action not in visits:
+                    visits[action] = [0, 0.0]
+                visits[action][0] += count
+                visits[action][1] += total
+
+        # the most visited action, and of those the best on average
+        legal_action = gameState.getLegalActions(0)
+        action = max(legal_action, key=lambda a: (visits.get(a, [0])[0],
+                                                  visits[a][1] / visits[a][0] if visits.get(a, [0])[0] else 0))
+        self.root = root
+        self.lastAction = action
+        self.moveStats.append({'playouts': playouts, 'seconds': time.monotonic() - start,
+                               'treeSize': self.treeSize, 'reused': reused})
+        return action
+
+    def reuse_subtree(self, gameState):
+        "Returns the node of the last search that matches gameState, if any"
+        if self.root == None or self.lastAction not in self.root.edges:
+            return None
+        for child in self.root.edges[self.lastAction].outcomes.values():
+            if child.state == gameState:
+                return child
+        return None
+
+    def tree_size(self, node):
+        size = 0
+        fringe = [node]
+        while fringe:
+            node = fringe.pop()
+            size += 1
+            for edge in node.edges.values():
+                fringe.extend(edge.outcomes.values())
+        return size
+
+    def search(self, root, deadline):
+        "Runs playouts from root until the deadline; returns how many"
+        count = 0
+        while True:
+            self.playout(root)
+            count += 1
+            if self.maxPlayouts > 0:
+                if count >= self.maxPlayouts: break
+            elif time.monotonic() > deadline:
+                break
+        return count
+
+    def playout(self, root):
+        node = root
+        path = []
+        while True:
+            state = node.state
+            if state.isWin() or state.isLose():
+                value = self.evaluationFunction(state)
+                break
+            if node.untried == None:
+                node.untried = state.getLegalActions(0)
+            if node.untried:
+                action = node.untried.pop(self.random.randrange(len(node.untried)))
+                node.edges[action] = MCTSEdge()
+            else:
+                action = self.select(node)
+            edge = node.edges[action]
+            path.append(edge)
+            successor, ghostActions = self.step(state, action)
+            child = edge.outcomes.get(ghostActions)
+            if child == None:
+                edge.outcomes[ghostActions] = MCTSNode(successor)
+                self.treeSize += 1
+                value = self.rollout(successor)
+                break
+            node = child
+        if value < self.low: self.low = value
+        if value > self.high: self.high = value
+        for edge in path:
+            edge.visits += 1
+            edge.total += value
+
+    def select(self, node):
+        "UCB1 over node's edges, with values scaled to the range seen so far"
+        logVisits = math.log(sum([edge.visits for edge in node.edges.values()]))
+        spread = self.high - self.low
+        best, bestScore = None, float('-inf')
+        for action, edge in node.edges.items():
+            mean = edge.total / edge.visits
+            if spread > 0:
+                mean = (mean - self.low) / spread
+            score = mean + self.exploration * math.sqrt(logVisits / edge.visits)
+            if score > bestScore:
+                best, bestScore = action, score
+        return best
+
+    def step(self, state, action):
+        """
+        Pacman's action followed by a reply from every ghost; returns the
+        resulting state and the ghosts' actions.
+        """
+        state = state.generateSuccessor(0, action)
+        ghostActions = []
+        for agentIndex in range(1, state.getNumAgents()):
+            if state.isWin() or state.isLose():
+                break
+            ghostAction = self.ghost_action(state, agentIndex)
+            ghostActions.append(ghostAction)
+            state = state.generateSuccessor(agentIndex, ghostAction)
+        return state, tuple(ghostActions)
+
+    def ghost_action(self, state, agentIndex):
+        if self.ghostModel == 'RandomGhost':
+            return self.random.choice(state.getLegalActions(agentIndex))
+        if agentIndex not in self.ghostModels:
+            self.ghostModels[agentIndex] = getattr(ghostAgents, self.ghostModel)(agentIndex)
+        distribution = self.ghostModels[agentIndex].getDistribution(state)
+        choice = self.random.random()
+        total = 0.0
+        for action, probability in distribution.items():
+            total += probability
+            if choice < total:
+                return action
+        return action
+
+    def rollout(self, state):
+        "Plays on from a state where Pacman is to move and scores the result"
+        numAgents = state.getNumAgents()
+        for ply in range(self.rolloutDepth * numAgents):
+            if state.isWin() or state.isLose():
+                break
+            agentIndex = ply % numAgents
+            if agentIndex == 0:
+                legal_action = state.getLegalActions(0)
+                if len(legal_action) > 1 and Directions.STOP in legal_action:
+                    legal_action.remove(Directions.STOP)
+                action = self.random.choice(legal_action)
+            else:
+                action = self.ghost_action(state, agentIndex)
+            state = state.generateSuccessor(agentIndex, action)
+        return self.evaluationFunction(state)
 
 def betterEvaluationFunction(currentGameState):
     """
@@ -313,5 +889,118 @@ def betterEvaluationFunction(currentGameState):
     return score
     util.raiseNotDefined()
 
+class MazeEvaluator:
+    """
+    Scores states the way betterEvaluationFunction does, but with maze
+    distances, and caches everything that can be shared between leaves:
+
+      - ghost distances come from the all-pairs table of mazeDistances.py,
+        built once per layout;
+      - the distance from every cell to its nearest pellet is worked out
+        once per food Grid with a breadth first search from all pellets.
+        Successors share their parent's food Grid until a pellet is eaten,
+        so a search only does this again below moves that eat;
+      - the non-score part of the value is memoised per (food Grid, Pacman
+        position, ghost positions and whether they are scared).
+
+    Layouts with more than maxCells open cells use betterEvaluationFunction.
+    """
+    def __init__(self, maxCells=4000, memoSize=100000):
+        self.maxCells = maxCells
+        self.memoSize = memoSize
+        self.walls = None
+        self.clearCaches()
+
+    def clearCaches(self):
+        self.foodFields = {}
+        self.memo = {}
+
+    def setWalls(self, walls):
+        self.walls = walls
+        self.clearCaches()
+        self.distances = None
+        if len(walls.asList(False)) > self.maxCells:
+            return
+        self.distances = mazeDistances.getMazeDistances(walls)
+        cellIds, height = self.distances.cellIds, walls.height
+        self.neighbors = []
+        for x, y in self.distances.cells:
+            self.neighbors.append([cellIds[nx * height + ny]
+                                   for nx, ny in ((x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y))
+                                   if cellIds[nx * height + ny] >= 0])
+
+    def foodField(self, food):
+        "Distance from every open cell (by id) to its closest pellet"
+        cached = self.foodFields.get(id(food))
+        if cached != None and cached[0] is food:
+            return cached[1]
+        field = array('H', [mazeDistances.UNREACHABLE]) * len(self.neighbors)
+        fringe = [self.distances.getCellId(pos) for pos in food.asList()]
+        for cell in fringe:
+            field[cell] = 0
+        depth = 0
+        while fringe:
+            depth += 1
+            nextFringe = []
+            for cell in fringe:
+                for other in self.neighbors[cell]:
+                    if field[other] == mazeDistances.UNREACHABLE:
+                        field[other] = depth
+                        nextFringe.append(other)
+            fringe = nextFringe
+        # Holding on to the Grid keeps its id, which the memo uses, from
+        # being reused
+        self.foodFields[id(food)] = (food, field)
+        return field
+
+    def evaluate(self, state):
+        walls = state.getWalls()
+        if walls is not self.walls:
+            self.setWalls(walls)
+        if self.distances == None:
+            return betterEvaluationFunction(state)
+        if len(self.memo) >= self.memoSize or len(self.foodFields) >= 1024:
+            self.clearCaches()
+
+        data = state.data
+        food = data.food
+        agentStates = data.agentStates
+        pac_pos = agentStates[0].configuration.pos
+        ghosts = tuple([(ghost.configuration.pos, ghost.scaredTimer > 0) for ghost in agentStates[1:]])
+        key = (id(food), pac_pos, ghosts)
+        value = self.memo.get(key)
+        if value == None:
+            self.foodField(food)
+            value = self.features(food, pac_pos, ghosts)
+            self.memo[key] = value
+        return data.score + value
+
+    def features(self, food, pac_pos, ghosts):
+        value = 0.0
+        pacCell = self.distances.getCellId(pac_pos)
+        foodDistance = self.foodField(food)[pacCell]
+        if 0 < foodDistance < mazeDistances.UNREACHABLE:
+            value += 1.0 / foodDistance
+        row = pacCell * len(self.distances.cells)
+        for ghost_pos, scared in ghosts:
+            dist = self.distances.distances[row + self.distances.getCellId(util.nearestPoint(ghost_pos))]
+            if dist != 0 and dist != mazeDistances.UNREACHABLE:
+                if scared:
+                    value += 10.0 / dist
+                else:
+                    value -= 1.0 / dist
+        return value
+
+_mazeEvaluator = MazeEvaluator()
+
+def mazeEvaluationFunction(currentGameState):
+    """
+    betterEvaluationFunction with maze distances in place of Manhattan
+    distances, computed through the caches of MazeEvaluator.  Use it with
+    -a evalFn=mazeEvaluationFunction (or evalFn=mazeBetter).
+    """
+    return _mazeEvaluator.evaluate(currentGameState)
+
 # Abbreviation
 better = betterEvaluationFunction
+mazeBetter = mazeEvaluationFunction
@@ -179,6 +179,8 @@ class GradingAgent(Agent):
         # keep track of elapsed moves
         self.stepCount = 0
         self.seed = seed
+        # the explored-state checks need every generated state recorded
+        GameState.setExploredTracking('states')
 
     def registerInitialState(self, state):
         if 'registerInitialState' in dir(self.studentAgent):
@@ -262,6 +264,8 @@ class PolyAgent(Agent):
         self.partialPlyBugLists = []
         self.seed = seed
         self.stepCount = 0
+        # the explored-state counts need every generated state recorded
+        GameState.setExploredTracking('states')
 
     def select(self, list, indices):
         """
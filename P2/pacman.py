@@ -77,15 +77,47 @@ class GameState:
     # Accessor methods: use these to access state data #
     ####################################################
 
-    # static variable keeps track of which states have had getLegalActions called
+    # static variables keep track of the states generateSuccessor has touched.
+    # Bookkeeping is off by default so that games neither hash nor retain
+    # every generated state; see setExploredTracking.
     explored = set()
+    exploredCount = 0
+    exploredTracking = None
+
+    def setExploredTracking(mode):
+        """
+        Chooses how generateSuccessor records explored states:
+          None     - no bookkeeping (the default)
+          'count'  - count generated successors without keeping them
+          'states' - keep every parent and successor in GameState.explored,
+                     as the autograder's explored-state checks expect
+        """
+        if mode not in [None, 'count', 'states']:
+            raise Exception('Unknown explored tracking mode: ' + str(mode))
+        GameState.exploredTracking = mode
+        GameState.getAndResetExplored()
+    setExploredTracking = staticmethod(setExploredTracking)
 
     def getAndResetExplored():
         tmp = GameState.explored.copy()
         GameState.explored = set()
+        GameState.exploredCount = 0
         return tmp
     getAndResetExplored = staticmethod(getAndResetExplored)
 
+    def getAndResetExploredCount():
+        """
+        Returns the number of explored states since the last reset: distinct
+        states under 'states' tracking, generated successors under 'count'.
+        """
+        if GameState.exploredTracking == 'states':
+            count = len(GameState.explored)
+        else:
+            count = GameState.exploredCount
+        GameState.getAndResetExplored()
+        return count
+    getAndResetExploredCount = staticmethod(getAndResetExploredCount)
+
     def getLegalActions(self, agentIndex=0):
         """
         Returns the legal actions for the agent specified.
@@ -107,8 +139,11 @@ class GameState:
         if self.isWin() or self.isLose():
             raise Exception('Can\'t generate a successor of a terminal state.')
 
-        # Copy current state
-        state = GameState(self)
+        # Copy current state.  Only the moving agent is copied up front; the
+        # rules copy anything else they change (see GameStateData.shallowCopy)
+        state = GameState()
+        state.data = self.data.shallowCopy()
+        state.data.copyAgentState(agentIndex)
 
         # Let agent's logic deal with its action's effects on the board
         if agentIndex == 0:  # Pacman is moving
@@ -129,8 +164,11 @@ class GameState:
         # Book keeping
         state.data._agentMoved = agentIndex
         state.data.score += state.data.scoreChange
-        GameState.explored.add(self)
-        GameState.explored.add(state)
+        if GameState.exploredTracking == 'states':
+            GameState.explored.add(self)
+            GameState.explored.add(state)
+        elif GameState.exploredTracking == 'count':
+            GameState.exploredCount += 1
         return state
 
     def getLegalPacmanActions(self):
@@ -283,11 +321,17 @@ class ClassicGameRules:
     def __init__(self, timeout=30):
         self.timeout = timeout
 
-    def newGame(self, layout, pacmanAgent, ghostAgents, display, quiet=False, catchExceptions=False):
+    def newGame(self, layout, pacmanAgent, ghostAgents, display, quiet=False, catchExceptions=False,
+                instrumentation=None):
         agents = [pacmanAgent] + ghostAgents[:layout.getNumGhosts()]
         initState = GameState()
         initState.initialize(layout, len(ghostAgents))
-        game = Game(agents, display, self, catchExceptions=catchExceptions)
+        for index, agent in enumerate(agents):
+            # agents that budget their own thinking time need to know it
+            if 'setMoveWarningTime' in dir(agent):
+                agent.setMoveWarningTime(self.getMoveWarningTime(index))
+        game = Game(agents, display, self, catchExceptions=catchExceptions,
+                    instrumentation=instrumentation)
         game.state = initState
         self.initialState = initState.deepCopy()
         self.quiet = quiet
@@ -391,11 +435,13 @@ class PacmanRules:
                 state.data._win = True
         # Eat capsule
         if(position in state.getCapsules()):
-            state.data.capsules.remove(position)
+            capsules = state.data.capsules[:]
+            capsules.remove(position)
+            state.data.capsules = capsules
             state.data._capsuleEaten = position
             # Reset all ghosts' scared timers
             for index in range(1, len(state.data.agentStates)):
-                state.data.agentStates[index].scaredTimer = SCARED_TIME
+                state.data.copyAgentState(index).scaredTimer = SCARED_TIME
     consume = staticmethod(consume)
 
 
@@ -411,6 +457,10 @@ class GhostRules:
         reach a dead end, but can turn 90 degrees at intersections.
         """
         conf = state.getGhostState(ghostIndex).configuration
+        actions = Actions.getMoveTable(state.data.layout.walls).ghostActions.get(
+            (conf.pos, conf.direction))
+        if actions != None:
+            return list(actions)
         possibleActions = Actions.getPossibleActions(
             conf, state.data.layout.walls)
         reverse = Actions.reverseDirection(conf.direction)
@@ -462,9 +512,11 @@ class GhostRules:
     def collide(state, ghostState, agentIndex):
         if ghostState.scaredTimer > 0:
             state.data.scoreChange += 200
+            ghostState = state.data.copyAgentState(agentIndex)
             GhostRules.placeGhost(state, ghostState)
             ghostState.scaredTimer = 0
             # Added for first-person
+            state.data._eaten = state.data._eaten[:]
             state.data._eaten[agentIndex] = True
         else:
             if not state.data._win:
@@ -544,8 +596,14 @@ def readCommand(argv):
                       help='Fixes the random seed to always play the same game', default=False)
     parser.add_option('-r', '--recordActions', action='store_true', dest='record',
                       help='Writes game histories to a file (named by the time they were played)', default=False)
+    parser.add_option('--recordFile', dest='recordFile',
+                      help='Appends recorded games to this file (implies -r)', default=None)
     parser.add_option('--replay', dest='gameToReplay',
-                      help='A recorded game file (pickle) to replay', default=None)
+                      help='A recorded game file to replay', default=None)
+    parser.add_option('--replayGame', dest='replayGame', type='int',
+                      help=default('Which game of the recorded game file to replay'), default=0)
+    parser.add_option('--replayFrom', dest='replayFrom', type='int',
+                      help=default('The move to start the replay from'), default=0)
     parser.add_option('-a', '--agentArgs', dest='agentArgs',
                       help='Comma separated values sent to agent. e.g. "opt1=val1,opt2,opt3=val3"')
     parser.add_option('-x', '--numTraining', dest='numTraining', type='int',
@@ -554,8 +612,10 @@ def readCommand(argv):
                       help=default('Time to delay between frames; <0 means keyboard'), default=0.1)
     parser.add_option('-c', '--catchExceptions', action='store_true', dest='catchExceptions',
                       help='Turns on exception handling and timeouts during games', default=False)
-    parser.add_option('--timeout', dest='timeout', type='int',
+    parser.add_option('--timeout', dest='timeout', type='float',
                       help=default('Maximum length of time an agent can spend computing in a single game'), default=30)
+    parser.add_option('--profileMoves', dest='profileMoves',
+                      help='Writes per-move agent and engine timings of all games to this JSON file', default=None)
 
     options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
@@ -606,14 +666,24 @@ def readCommand(argv):
             options.zoom, frameTime=options.frameTime)
     args['numGames'] = options.numGames
     args['record'] = options.record
+    if options.recordFile != None:
+        args['record'] = options.recordFile
     args['catchExceptions'] = options.catchExceptions
     args['timeout'] = options.timeout
+    if options.profileMoves != None:
+        args['profileMoves'] = options.profileMoves
 
     # Special case: recorded games don't use the runGames method or args structure
     if options.gameToReplay != None:
         print('Replaying recorded game %s.' % options.gameToReplay)
+        import gameRecord
+        if gameRecord.isGameRecordFile(options.gameToReplay):
+            recorded = gameRecord.readGameRecords(options.gameToReplay)[options.replayGame]
+            replayRecordedGame(recorded, args['display'], options.replayFrom)
+            sys.exit(0)
+        # games recorded as pickles by older versions
         import pickle
-        f = open(options.gameToReplay)
+        f = open(options.gameToReplay, 'rb')
         try:
             recorded = pickle.load(f)
         finally:
@@ -674,12 +744,53 @@ def replayGame(layout, actions, display):
     display.finish()
 
 
-def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30):
+def replayRecordedGame(recorded, display, startMove=0):
+    """
+    Replays a gameRecord.RecordedGame, starting from the state after
+    startMove moves.
+    """
+    import pacmanAgents
+    import ghostAgents
+    rules = ClassicGameRules()
+    agents = [pacmanAgents.GreedyAgent()] + [ghostAgents.RandomGhost(i+1)
+                                             for i in range(recorded.numGhosts)]
+    game = rules.newGame(recorded.layout, agents[0], agents[1:], display)
+    state = recorded.stateAt(startMove, GameState)
+    display.initialize(state.data)
+
+    for action in recorded.moves[startMove:]:
+        state = state.generateSuccessor(*action)
+        display.update(state.data)
+        rules.process(state, game)
+
+    display.finish()
+
+
+def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, catchExceptions=False, timeout=30,
+             profileMoves=None):
+    """
+    record is False, True (record to a file named by the time) or the name
+    of a game record file to append the games to.  profileMoves names a
+    JSON file for the per-move timings of every game (see
+    game.GameInstrumentation).
+    """
     import __main__
     __main__.__dict__['_display'] = display
 
     rules = ClassicGameRules(timeout)
     games = []
+    recorder = None
+    if record:
+        import time
+        import gameRecord
+        fname = record
+        if record == True:
+            fname = 'recorded-games-' + '-'.join([str(t) for t in time.localtime()[1:6]]) + '.rec'
+        recorder = gameRecord.GameRecordWriter(fname)
+    instrumentation = None
+    if profileMoves != None:
+        from game import GameInstrumentation
+        instrumentation = GameInstrumentation()
 
     for i in range(numGames):
         beQuiet = i < numTraining
@@ -692,20 +803,18 @@ def runGames(layout, pacman, ghosts, display, numGames, record, numTraining=0, c
             gameDisplay = display
             rules.quiet = False
         game = rules.newGame(layout, pacman, ghosts,
-                             gameDisplay, beQuiet, catchExceptions)
+                             gameDisplay, beQuiet, catchExceptions, instrumentation)
         game.run()
         if not beQuiet:
             games.append(game)
 
-        if record:
-            import time
-            import pickle
-            fname = ('recorded-game-%d' % (i + 1)) + \
-                '-'.join([str(t) for t in time.localtime()[1:6]])
-            f = file(fname, 'w')
-            components = {'layout': layout, 'actions': game.moveHistory}
-            pickle.dump(components, f)
-            f.close()
+        if recorder != None:
+            recorder.writeGame(game, rules.initialState)
+
+    if recorder != None:
+        recorder.close()
+    if instrumentation != None:
+        instrumentation.writeJSON(profileMoves)
 
     if (numGames-numTraining) > 0:
         scores = [game.state.getScore() for game in games]
@@ -0,0 +1,175 @@
+# parallelSearch.py
+# -----------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Splits the top of a game tree search in multiAgents.py across a pool of
+worker processes.
+
+MCTSAgent runs root parallel: every worker grows its own tree from the
+same position and the root visit counts are added up (see mctsTask).
+
+Minimax and expectimax are split two plies down, below every pair of a
+Pacman action and a first ghost action, which gives a few dozen subtrees
+for the workers.  Alpha-beta is split young brothers wait style: the first
+root action is searched here to get a bound, then the rest are searched in
+parallel with it.  Either way the values are combined in legal action order,
+so the chosen action is the one the serial search would choose.
+
+GameStates go to the workers as small tuples (see packState) and the pools
+live for the whole process, so they are shared by every move and game.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+from game import AgentState, Configuration, reconstituteGrid
+import layout
+
+_pools = {}
+
+def getPool(workers):
+    "Returns the process pool with this many workers, starting it if needed"
+    if workers not in _pools:
+        _pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return _pools[workers]
+
+def packState(state):
+    """
+    Returns a picklable tuple holding everything a search needs from a
+    GameState.  The layout is sent as its text, the food as Grid.toBytes.
+    """
+    data = state.data
+    agents = tuple((agentState.start.pos, agentState.start.direction,
+                    agentState.configuration.pos, agentState.configuration.direction,
+                    agentState.isPacman, agentState.scaredTimer)
+                   for agentState in data.agentStates)
+    return (tuple(data.layout.layoutText), data.food.toBytes(), tuple(data.capsules),
+            agents, tuple(data._eaten), data.score, data._win, data._lose)
+
+def unpackState(packed):
+    "Rebuilds the GameState of a packState tuple"
+    import pacman
+    layoutText, food, capsules, agents, eaten, score, win, lose = packed
+    state = pacman.GameState()
+    data = state.data
+    data.layout = layout.layoutFromText(layoutText)
+    data.food = reconstituteGrid(food)
+    data.capsules = list(capsules)
+    data.agentStates = []
+    for startPos, startDirection, pos, direction, isPacman, scaredTimer in agents:
+        agentState = AgentState(Configuration(startPos, startDirection), isPacman)
+        agentState.configuration = Configuration(pos, direction)
+        agentState.scaredTimer = scaredTimer
+        data.agentStates.append(agentState)
+    data._eaten = list(eaten)
+    data.score = score
+    data._win = win
+    data._lose = lose
+    return state
+
+def agentSpec(agent):
+    """
+    What a worker needs to build its own copy of a search agent.  Agents
+    with more settings list them, as constructor arguments, in workerArgs.
+    """
+    workerArgs = tuple(sorted(getattr(agent, 'workerArgs', {}).items()))
+    return (agent.__class__, agent.evaluationFunction, agent.depth, workerArgs)
+
+_agents = {}
+
+def workerAgent(spec):
+    """
+    The worker's copy of an agent.  Copies search serially and without a
+    transposition table.
+    """
+    if spec not in _agents:
+        agentClass, evaluationFunction, depth, workerArgs = spec
+        agent = agentClass(depth=str(depth), **dict(workerArgs))
+        agent.evaluationFunction = evaluationFunction
+        _agents[spec] = agent
+    return _agents[spec]
+
+def plyValueTask(spec, packed, ply):
+    return workerAgent(spec).ply_value(unpackState(packed), ply)
+
+def alphaBetaTask(spec, packed, alpha, beta):
+    return workerAgent(spec).ab_main(alpha, beta, unpackState(packed), 1)[1]
+
+def mctsTask(spec, packed, deadline, seed):
+    """
+    Grows a fresh MCTS tree until the deadline.  Returns the root's
+    {action: (visits, total value)} and the number of playouts.
+    """
+    import multiAgents
+    agent = workerAgent(spec)
+    agent.random.seed(seed)
+    root = multiAgents.MCTSNode(unpackState(packed))
+    agent.treeSize = 1
+    agent.low, agent.high = float('inf'), float('-inf')
+    playouts = agent.search(root, deadline)
+    rootVisits = dict((action, (edge.visits, edge.total)) for action, edge in root.edges.items())
+    return rootVisits, playouts
+
+def rootValues(agent, gameState, actions):
+    """
+    Returns agent.ply_value of the successor of each root action, computed by
+    the agent's worker pool.  Below each action, subtrees are split at the
+    first ghost's moves and joined with agent.ghost_value.
+    """
+    pool = getPool(agent.workers)
+    spec = agentSpec(agent)
+    split = []
+    for action in actions:
+        successor = gameState.generateSuccessor(0, action)
+        ghostActions = []
+        if gameState.getNumAgents() > 1:
+            ghostActions = successor.getLegalActions(1)
+        if len(ghostActions) == 0:
+            split.append((successor, None))
+        else:
+            futures = [pool.submit(plyValueTask, spec,
+                                   packState(successor.generateSuccessor(1, ghostAction)), 2)
+                       for ghostAction in ghostActions]
+            split.append((successor, futures))
+
+    values = []
+    for successor, futures in split:
+        if futures == None:
+            values.append(agent.ply_value(successor, 1))
+        else:
+            values.append(agent.ghost_value(successor, [future.result() for future in futures]))
+    return values
+
+def alphaBetaRootAction(agent, gameState):
+    """
+    The action AlphaBetaAgent.max_value would choose at the root.  The first
+    action is searched here with a full window; its value is the alpha for
+    the others, which are searched at once.  A sibling whose value is below
+    that alpha can never be chosen, so searching it with less alpha than
+    the serial search would have had does not change the answer.
+    """
+    actions = gameState.getLegalActions(0)
+    if len(actions) == 0:
+        return None
+    pool = getPool(agent.workers)
+    spec = agentSpec(agent)
+    first = agent.ab_main(float('-inf'), float('inf'), gameState.generateSuccessor(0, actions[0]), 1)
+    futures = [pool.submit(alphaBetaTask, spec, packState(gameState.generateSuccessor(0, action)),
+                           first[1], float('inf'))
+               for action in actions[1:]]
+    values = [first[1]] + [future.result() for future in futures]
+    best = (None, float('-inf'))
+    for action, value in zip(actions, values):
+        if best[1] < value:
+            best = (action, value)
+    return best[0]
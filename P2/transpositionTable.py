@@ -0,0 +1,158 @@
+# transpositionTable.py
+# ---------------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A bounded transposition table for the game tree searches in multiAgents.py.
+
+Positions are keyed by a Zobrist hash: every feature of a GameState that can
+change during a search (Pacman's cell, each ghost's configuration and scared
+timer, every food pellet and capsule, the agent to move and the remaining
+depth) is given a random 64 bit number, and the key of a position is the XOR
+of the numbers of its features.
+
+Example:
+table = TranspositionTable(1 << 16)
+key, entry = table.lookup(state, agentIndex, remainingDepth)
+if entry == None:
+    value = search(...)
+    table.store(key, remainingDepth, value, EXACT)
+"""
+
+import random
+
+# Bound types of stored values
+EXACT = 0  # the value of the position
+LOWER = 1  # the value is at least this (the search failed high)
+UPPER = 2  # the value is at most this (the search failed low)
+
+class ZobristHasher:
+    """
+    Computes Zobrist keys of GameStates.  The random numbers for features are
+    drawn on first use from a private, fixed-seed generator, so keys are the
+    same from run to run and the game's own random stream is left alone.
+    """
+    def __init__(self, seed=0):
+        self.random = random.Random(seed)
+        self.featureKeys = {}
+        self.foodKeys = None
+        self.foodHashes = {}
+
+    def featureKey(self, feature):
+        key = self.featureKeys.get(feature)
+        if key == None:
+            key = self.random.getrandbits(64)
+            self.featureKeys[feature] = key
+        return key
+
+    def foodHash(self, food):
+        """
+        XOR of the keys of every pellet in a food Grid.  Successor states
+        share their parent's Grid until a pellet is eaten, so the hash is
+        remembered per Grid object.
+        """
+        cached = self.foodHashes.get(id(food))
+        if cached != None and cached[0] is food:
+            return cached[1]
+        if self.foodKeys == None or len(self.foodKeys) != food.width * food.height:
+            self.foodKeys = [self.random.getrandbits(64) for i in range(food.width * food.height)]
+        h = 0
+        index = 0
+        for column in food.data:
+            for hasFood in column:
+                if hasFood: h ^= self.foodKeys[index]
+                index += 1
+        if len(self.foodHashes) >= 4096:
+            self.foodHashes = {}
+        # Holding on to the Grid keeps its id from being reused
+        self.foodHashes[id(food)] = (food, h)
+        return h
+
+    def hash(self, state, agentIndex, remainingDepth):
+        data = state.data
+        h = self.foodHash(data.food) ^ self.featureKey(('turn', agentIndex, remainingDepth))
+        h ^= self.featureKey(('score', data.score))
+        for index, agentState in enumerate(data.agentStates):
+            configuration = agentState.configuration
+            if index == 0:
+                h ^= self.featureKey(('pacman', configuration.pos))
+            else:
+                h ^= self.featureKey(('ghost', index, configuration.pos, configuration.direction))
+                if agentState.scaredTimer > 0:
+                    h ^= self.featureKey(('scared', index, agentState.scaredTimer))
+        for capsule in data.capsules:
+            h ^= self.featureKey(('capsule', capsule))
+        return h
+
+class TranspositionTable:
+    """
+    A fixed number of slots indexed by Zobrist key.  A slot is replaced by
+    a position searched at least as deeply, or by anything once the slot's
+    entry comes from an earlier search (see newSearch).
+
+    hits counts lookups that found a usable entry, misses the rest.
+    """
+    def __init__(self, size=1 << 16, seed=0):
+        if size <= 0: raise Exception('Transposition table size must be positive')
+        self.size = size
+        self.slots = [None] * size
+        self.hasher = ZobristHasher(seed)
+        self.generation = 0
+        self.resetStats()
+
+    def resetStats(self):
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+
+    def newSearch(self):
+        "Marks every current entry as replaceable; call once per move"
+        self.generation += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+    def lookup(self, state, agentIndex, remainingDepth, alpha=None, beta=None):
+        """
+        Returns (key, entry) where key is passed on to store.  entry is a
+        tuple (value, bound, action) or None.
+
+        Without alpha and beta only EXACT entries are returned.  With them, a
+        bound is returned when it alone settles the position the way the
+        alpha-beta search in multiAgents.py prunes: a LOWER bound above beta
+        or an UPPER bound below alpha.
+        """
+        key = self.hasher.hash(state, agentIndex, remainingDepth)
+        slot = self.slots[key % self.size]
+        if slot != None and slot[0] == key:
+            value, bound = slot[3], slot[4]
+            if bound == EXACT or (alpha != None and
+                                  ((bound == LOWER and value > beta) or
+                                   (bound == UPPER and value < alpha))):
+                self.hits += 1
+                return key, (value, bound, slot[5])
+        self.misses += 1
+        return key, None
+
+    def store(self, key, remainingDepth, value, bound=EXACT, action=None):
+        index = key % self.size
+        slot = self.slots[index]
+        if (slot == None or slot[0] == key or slot[2] != self.generation or
+                remainingDepth >= slot[1]):
+            self.slots[index] = (key, remainingDepth, self.generation, value, bound, action)
+            self.stores += 1
+
+    def getStats(self):
+        lookups = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'stores': self.stores,
+                'hitRate': self.hits / float(lookups) if lookups else 0.0}
@@ -641,13 +641,16 @@ def pause():
 
 # code to handle timeouts
 #
-# FIXME
-# NOTE: TimeoutFuncton is NOT reentrant.  Later timeouts will silently
-# disable earlier timeouts.  Could be solved by maintaining a global list
-# of active time outs.  Currently, questions which have test cases calling
-# this have all student code so wrapped.
+# Every TimeoutFunction shares one SIGALRM handler and one interval timer.
+# The calls in progress are kept as a list of Deadlines and the timer is
+# armed for the earliest of them, so nested timeouts no longer disable each
+# other.  The handler is installed once and stays in place across calls; it
+# is only installed again if other code has replaced it since.  Deadlines
+# are on the time.monotonic clock, so changes to the system time do not
+# move them.
 #
 import signal
+import threading
 import time
 
 
@@ -656,7 +659,88 @@ class TimeoutFunctionException(Exception):
     pass
 
 
+class Deadline:
+    """
+    A point in time a piece of code should be finished by, on the
+    time.monotonic clock.  Agents can poll it to stop searching cleanly
+    rather than being interrupted; see currentDeadline.
+    """
+
+    def __init__(self, seconds):
+        self.start = time.monotonic()
+        self.end = self.start + seconds
+
+    def remaining(self):
+        return self.end - time.monotonic()
+
+    def expired(self):
+        return time.monotonic() >= self.end
+
+    def check(self):
+        "Raises TimeoutFunctionException once the deadline has passed"
+        if self.expired():
+            raise TimeoutFunctionException()
+
+
+_timeouts = threading.local()
+
+
+def _activeDeadlines():
+    if not hasattr(_timeouts, 'deadlines'):
+        _timeouts.deadlines = []
+    return _timeouts.deadlines
+
+
+def currentDeadline():
+    """
+    The earliest Deadline of the TimeoutFunction calls this thread is
+    inside, or None.  An agent's getAction called by a game with timeouts
+    on sees the time it has left for the move.
+    """
+    deadlines = _activeDeadlines()
+    if len(deadlines) == 0:
+        return None
+    return min(deadlines, key=lambda deadline: deadline.end)
+
+
+def _useAlarm():
+    # Signals are only delivered to the main thread
+    return (hasattr(signal, 'setitimer') and
+            threading.current_thread() is threading.main_thread())
+
+
+def _handleAlarm(signum, frame):
+    deadline = currentDeadline()
+    if deadline == None:
+        return
+    if deadline.expired():
+        raise TimeoutFunctionException()
+    # Fired early (the timer was armed for a deadline since left); wait on
+    _armAlarm()
+
+
+def _armAlarm():
+    deadline = currentDeadline()
+    if deadline == None:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+    else:
+        if signal.getsignal(signal.SIGALRM) is not _handleAlarm:
+            signal.signal(signal.SIGALRM, _handleAlarm)
+        # setitimer treats 0 as "off", so an overdue deadline fires at once
+        signal.setitimer(signal.ITIMER_REAL, max(deadline.remaining(), 1e-6))
+
+
 class TimeoutFunction:
+    """
+    Calls function with a time limit in seconds, which may be fractional.
+    The same TimeoutFunction can be called any number of times, with its own
+    timeout or, through callWithin, a different one each call.
+
+    On the main thread of a system with SIGALRM, the call is interrupted
+    with TimeoutFunctionException when the time runs out.  Elsewhere the
+    time is checked after the function returns.
+    """
+
     def __init__(self, function, timeout):
         self.timeout = timeout
         self.function = function
@@ -665,23 +749,24 @@ class TimeoutFunction:
         raise TimeoutFunctionException()
 
     def __call__(self, *args, **keyArgs):
-        # If we have SIGALRM signal, use it to cause an exception if and
-        # when this function runs too long.  Otherwise check the time taken
-        # after the method has returned, and throw an exception then.
-        if hasattr(signal, 'SIGALRM'):
-            old = signal.signal(signal.SIGALRM, self.handle_timeout)
-            signal.alarm(self.timeout)
-            try:
-                result = self.function(*args, **keyArgs)
-            finally:
-                signal.signal(signal.SIGALRM, old)
-            signal.alarm(0)
-        else:
-            startTime = time.time()
+        return self.callWithin(self.timeout, *args, **keyArgs)
+
+    def callWithin(self, timeout, *args, **keyArgs):
+        deadline = Deadline(timeout)
+        deadlines = _activeDeadlines()
+        useAlarm = _useAlarm()
+        try:
+            deadlines.append(deadline)
+            if useAlarm:
+                _armAlarm()
             result = self.function(*args, **keyArgs)
-            timeElapsed = time.time() - startTime
-            if timeElapsed >= self.timeout:
-                self.handle_timeout(None, None)
+        finally:
+            if deadline in deadlines:
+                deadlines.remove(deadline)
+            if useAlarm:
+                _armAlarm()
+        if not useAlarm and deadline.expired():
+            self.handle_timeout(None, None)
         return result
 
 
@@ -0,0 +1,200 @@
+# compiledMdp.py
+# --------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+A MarkovDecisionProcess flattened into NumPy arrays, so that a Bellman
+backup of every state is a few array operations.
+
+States are numbered in getStates order.  Every (state, action) pair with a
+legal action gets a row, numbered state by state in getPossibleActions
+order, so the rows of one state are contiguous.  Transitions are stored
+sparsely, one entry per (row, next state):
+
+  pairState[row]        the state of the row
+  pairActions[row]      its action
+  pairStart[state]      the first row of the state (the rows of states
+                        without actions are empty)
+  transitionPair[t]     the row of transition t
+  transitionNext[t]     the next state of transition t
+  transitionProb[t]     its probability
+  transitionReward[t]   its reward
+  expectedReward[row]   sum of probability * reward over the row
+  terminal[state]       True for states with no legal actions; their
+                        value is always 0
+
+NumPy is only needed once an MDP is compiled.
+
+Example:
+compiled = CompiledMDP(mdp)
+values = compiled.zeroValues()
+for i in range(100):
+    values = compiled.backup(values, 0.9)
+"""
+
+class CompiledMDP:
+    """
+    The arrays of an MDP; see the module docstring.  The MDP is read once,
+    so a compiled MDP goes stale if its noise or rewards change.
+    """
+    def __init__(self, mdp):
+        import numpy
+        self.numpy = numpy
+        self.states = mdp.getStates()
+        self.stateIndex = dict((state, i) for i, state in enumerate(self.states))
+
+        pairState, pairStart, pairActions = [], [], []
+        transitionPair, transitionNext, transitionProb, transitionReward = [], [], [], []
+        for i, state in enumerate(self.states):
+            pairStart.append(len(pairState))
+            for action in mdp.getPossibleActions(state):
+                row = len(pairState)
+                pairState.append(i)
+                pairActions.append(action)
+                for nextState, prob in mdp.getTransitionStatesAndProbs(state, action):
+                    transitionPair.append(row)
+                    transitionNext.append(self.stateIndex[nextState])
+                    transitionProb.append(prob)
+                    transitionReward.append(mdp.getReward(state, action, nextState))
+
+        self.numStates = len(self.states)
+        self.numPairs = len(pairState)
+        self.pairActions = pairActions
+        self.pairState = numpy.array(pairState, dtype=numpy.intp)
+        self.pairStart = numpy.array(pairStart, dtype=numpy.intp)
+        self.transitionPair = numpy.array(transitionPair, dtype=numpy.intp)
+        self.transitionNext = numpy.array(transitionNext, dtype=numpy.intp)
+        self.transitionProb = numpy.array(transitionProb, dtype=float)
+        self.transitionReward = numpy.array(transitionReward, dtype=float)
+        self.expectedReward = numpy.bincount(self.transitionPair,
+                                             weights=self.transitionProb * self.transitionReward,
+                                             minlength=self.numPairs)
+        self.terminal = numpy.bincount(self.pairState, minlength=self.numStates) == 0
+        # maximum.reduceat needs the first row of every state that has rows
+        self.actingStates = numpy.flatnonzero(~self.terminal)
+
+    def zeroValues(self):
+        return self.numpy.zeros(self.numStates)
+
+    def qValues(self, values, discount):
+        "The Q-value of every row under the given state values"
+        future = self.numpy.bincount(self.transitionPair,
+                                     weights=self.transitionProb * values[self.transitionNext],
+                                     minlength=self.numPairs)
+        return self.expectedReward + discount * future
+
+    def maxByState(self, qValues):
+        "The largest Q-value of each state, 0 for terminal states"
+        best = self.zeroValues()
+        if self.numPairs > 0:
+            best[self.actingStates] = self.numpy.maximum.reduceat(
+                qValues, self.pairStart[self.actingStates])
+        return best
+
+    def backup(self, values, discount):
+        "One synchronous Bellman backup of every state"
+        return self.maxByState(self.qValues(values, discount))
+
+    def greedyRows(self, qValues):
+        """
+        A policy given as one row per state: the row with the best Q-value,
+        the first one in getPossibleActions order on ties, or -1 for
+        terminal states.
+        """
+        numpy = self.numpy
+        best = self.maxByState(qValues)
+        rows = numpy.flatnonzero(qValues == best[self.pairState])
+        firstRows = rows[numpy.unique(self.pairState[rows], return_index=True)[1]]
+        policyRows = numpy.full(self.numStates, -1, dtype=numpy.intp)
+        policyRows[self.pairState[firstRows]] = firstRows
+        return policyRows
+
+    def startingRows(self, discount):
+        """
+        The greedy policy after one backup from zero values, which heads for
+        any exit one step away.  It is not always proper (a state may never
+        reach an exit under it), so evaluating it can still diverge.
+        """
+        return self.greedyRows(self.qValues(self.zeroValues(), discount))
+
+    def improvedRows(self, policyRows, qValues, margin=1e-10):
+        """
+        The greedy policy for qValues, keeping the current action wherever
+        no other one is better by more than margin, so that policy
+        iteration does not cycle between tied actions.
+        """
+        numpy = self.numpy
+        greedy = self.greedyRows(qValues)
+        acting = ~self.terminal
+        better = numpy.zeros(self.numStates, dtype=bool)
+        better[acting] = qValues[greedy[acting]] > qValues[policyRows[acting]] + margin
+        return numpy.where(better, greedy, policyRows)
+
+    def rowsToPolicy(self, policyRows):
+        "The action of each state of a policy given as rows, None if terminal"
+        return [self.pairActions[row] if row >= 0 else None for row in policyRows.tolist()]
+
+    def greedyPolicy(self, values, discount):
+        """
+        The best action of each state (None for terminal states), the first
+        one in getPossibleActions order on ties.
+        """
+        return self.rowsToPolicy(self.greedyRows(self.qValues(values, discount)))
+
+    def policyModel(self, policyRows):
+        """
+        The Markov chain of following a policy given as rows: a tuple of the
+        expected reward of each state and the (state, next state,
+        probability) arrays of its transitions.
+        """
+        numpy = self.numpy
+        acting = ~self.terminal
+        rewards = self.zeroValues()
+        rewards[acting] = self.expectedReward[policyRows[acting]]
+        chosen = numpy.zeros(self.numPairs, dtype=bool)
+        chosen[policyRows[acting]] = True
+        selected = chosen[self.transitionPair]
+        return (rewards, self.pairState[self.transitionPair[selected]],
+                self.transitionNext[selected], self.transitionProb[selected])
+
+    def evaluationSweep(self, policyModel, values, discount):
+        "One backup of every state under the policy"
+        rewards, source, nextStates, probs = policyModel
+        return rewards + discount * self.numpy.bincount(
+            source, weights=probs * values[nextStates], minlength=self.numStates)
+
+    def solvePolicy(self, policyModel, discount):
+        """
+        The exact values of the policy, from a sparse solve of
+        (I - discount * P) V = R.  Needs SciPy.  The values are not finite
+        when the system is singular.
+        """
+        from scipy.sparse import csr_matrix, identity
+        from scipy.sparse.linalg import spsolve
+        import warnings
+        rewards, source, nextStates, probs = policyModel
+        n = self.numStates
+        # repeated (state, next state) entries are added up
+        transitions = csr_matrix((probs, (source, nextStates)), shape=(n, n))
+        with warnings.catch_warnings():
+            # a policy that never reaches an exit with discount 1 makes the
+            # system singular; the caller checks for non-finite values
+            warnings.simplefilter('ignore')
+            return spsolve((identity(n, format='csr') - discount * transitions).tocsc(), rewards)
+
+    def valuesToCounter(self, values):
+        import util
+        counter = util.Counter()
+        for state, value in zip(self.states, values.tolist()):
+            counter[state] = value
+        return counter
@@ -16,6 +16,7 @@
 
 from game import Directions, Actions
 import util
+import mazeDistances
 
 class FeatureExtractor:
     def getFeatures(self, state, action):
@@ -44,24 +45,11 @@ class CoordinateExtractor(FeatureExtractor):
 def closestFood(pos, food, walls):
     """
     closestFood -- this is similar to the function that we have
-    worked on in the search project; here its all in one place
+    worked on in the search project; the maze distances come from the
+    all-pairs table for these walls (see mazeDistances.py)
     """
-    fringe = [(pos[0], pos[1], 0)]
-    expanded = set()
-    while fringe:
-        pos_x, pos_y, dist = fringe.pop(0)
-        if (pos_x, pos_y) in expanded:
-            continue
-        expanded.add((pos_x, pos_y))
-        # if we find a food at this location then exit
-        if food[pos_x][pos_y]:
-            return dist
-        # otherwise spread out from the location to its neighbours
-        nbrs = Actions.getLegalNeighbors((pos_x, pos_y), walls)
-        for nbr_x, nbr_y in nbrs:
-            fringe.append((nbr_x, nbr_y, dist+1))
-    # no food found
-    return None
+    # None if there is no food or none of it can be reached
+    return mazeDistances.getMazeDistances(walls).getClosest(pos, food.asList())
 
 class SimpleExtractor(FeatureExtractor):
     """
@@ -31,6 +31,7 @@ class Gridworld(mdp.MarkovDecisionProcess):
         # parameters
         self.livingReward = 0.0
         self.noise = 0.2
+        self.model = None
 
     def setLivingReward(self, reward):
         """
@@ -41,12 +42,23 @@ class Gridworld(mdp.MarkovDecisionProcess):
         future rewards.
         """
         self.livingReward = reward
+        self.model = None
 
     def setNoise(self, noise):
         """
         The probability of moving in an unintended direction.
         """
         self.noise = noise
+        self.model = None
+
+    def getModel(self):
+        """
+        The GridworldModel for the current noise and living reward, built on
+        first use.  The grid itself is assumed not to change.
+        """
+        if self.model == None:
+            self.model = GridworldModel(self)
+        return self.model
 
 
     def getPossibleActions(self, state):
@@ -60,7 +72,7 @@ class Gridworld(mdp.MarkovDecisionProcess):
         if state == self.grid.terminalState:
             return ()
         x,y = state
-        if type(self.grid[x][y]) == int:
+        if type(self.grid[x][y]) == int or type(self.grid[x][y]) == float:
             return ('exit',)
         return ('north','west','south','east')
 
@@ -68,6 +80,9 @@ class Gridworld(mdp.MarkovDecisionProcess):
         """
         Return list of all states.
         """
+        return list(self.getModel().states)
+
+    def computeStates(self):
         # The true terminal state.
         states = [self.grid.terminalState]
         for x in range(self.grid.width):
@@ -85,6 +100,12 @@ class Gridworld(mdp.MarkovDecisionProcess):
         departed (as in the R+N book examples, which more or
         less use this convention).
         """
+        reward = self.getModel().rewards.get(state)
+        if reward != None:
+            return reward
+        return self.computeReward(state)
+
+    def computeReward(self, state):
         if state == self.grid.terminalState:
             return 0.0
         x, y = state
@@ -118,7 +139,12 @@ class Gridworld(mdp.MarkovDecisionProcess):
         from 'state' by taking 'action' along
         with their transition probabilities.
         """
+        successors = self.getModel().transitions.get((state, action))
+        if successors != None:
+            return list(successors)
+        return self.computeTransitionStatesAndProbs(state, action)
 
+    def computeTransitionStatesAndProbs(self, state, action):
         if action not in self.getPossibleActions(state):
             raise Exception("Illegal action!")
 
@@ -176,6 +202,25 @@ class Gridworld(mdp.MarkovDecisionProcess):
         if x < 0 or x >= self.grid.width: return False
         return self.grid[x][y] != '#'
 
+class GridworldModel:
+    """
+    A Gridworld's states, rewards and transitions for one noise and living
+    reward, computed once so that the MDP methods are dictionary lookups:
+
+      states                       getStates, as a tuple
+      rewards[state]               the reward for leaving the state
+      transitions[(state, action)] getTransitionStatesAndProbs, as a tuple
+    """
+    def __init__(self, gridworld):
+        self.states = tuple(gridworld.computeStates())
+        self.rewards = {}
+        self.transitions = {}
+        for state in self.states:
+            self.rewards[state] = gridworld.computeReward(state)
+            for action in gridworld.getPossibleActions(state):
+                self.transitions[(state, action)] = tuple(
+                    gridworld.computeTransitionStatesAndProbs(state, action))
+
 class GridworldEnvironment(environment.Environment):
 
     def __init__(self, gridWorld):
@@ -313,6 +358,54 @@ def getMazeGrid():
 
 
 
+def generateGrid(width, height, wallDensity=0.2, exitRewards=(10, -10), seed=0):
+    """
+    A random width x height grid, as rows for makeGrid, that is the same
+    for the same arguments.  Each cell is a wall with probability
+    wallDensity.  Only the largest connected region of open cells is kept,
+    the rest become walls; the start is its lowest, leftmost cell and an
+    exit is put on a random cell of it for each of exitRewards.
+    """
+    rand = random.Random(seed)
+    # cells[y][x], with y = 0 the bottom row
+    cells = [['#' if rand.random() < wallDensity else ' ' for x in range(width)]
+             for y in range(height)]
+    region = []
+    seen = set()
+    for y in range(height):
+        for x in range(width):
+            if cells[y][x] == '#' or (x, y) in seen:
+                continue
+            reached = [(x, y)]
+            seen.add((x, y))
+            for cellx, celly in reached:
+                for nextx, nexty in ((cellx + 1, celly), (cellx - 1, celly), (cellx, celly + 1), (cellx, celly - 1)):
+                    if (0 <= nextx < width and 0 <= nexty < height and
+                            cells[nexty][nextx] != '#' and (nextx, nexty) not in seen):
+                        seen.add((nextx, nexty))
+                        reached.append((nextx, nexty))
+            if len(reached) > len(region):
+                region = reached
+    if len(region) < len(exitRewards) + 1:
+        raise Exception('Too few open cells for %d exits; lower the wall density' % len(exitRewards))
+    kept = set(region)
+    for y in range(height):
+        for x in range(width):
+            if (x, y) not in kept:
+                cells[y][x] = '#'
+    startx, starty = region[0]
+    cells[starty][startx] = 'S'
+    for reward, (x, y) in zip(exitRewards, rand.sample(sorted(region[1:]), len(exitRewards))):
+        cells[y][x] = reward
+    cells.reverse()
+    return cells
+
+def getRandomGrid(width=20, height=20, wallDensity=0.2, exitRewards=(10, -10), seed=0):
+    return Gridworld(generateGrid(width, height, wallDensity, exitRewards, seed))
+
+# The -a agents that compute values before any episode is run
+VALUE_AGENTS = ('value', 'asynchvalue', 'priosweepvalue', 'vectorvalue', 'policy', 'modifiedpolicy')
+
 def getUserAction(state, actionFunction):
     """
     Get an action from the user (rather than the agent).
@@ -398,6 +491,15 @@ def parseOptions():
     optParser.add_option('-i', '--iterations',action='store',
                          type='int',dest='iters',default=10,
                          metavar="K", help='Number of rounds of value iteration (default %default)')
+    optParser.add_option('--tolerance',action='store',
+                         type='float',dest='tolerance',default=0.0,
+                         metavar="T", help='Stop vectorvalue iteration once no value changes by more than T (default %default)')
+    optParser.add_option('--evaluation',action='store',
+                         type='string',dest='evaluation',default='solve',
+                         help='Policy evaluation for the policy agent: solve (needs SciPy) or sweeps (default %default)')
+    optParser.add_option('--evaluationSweeps',action='store',
+                         type='int',dest='evaluationSweeps',default=5,
+                         metavar="M", help='Evaluation sweeps per iteration of modifiedpolicy (default %default)')
     optParser.add_option('-k', '--episodes',action='store',
                          type='int',dest='episodes',default=1,
                          metavar="K", help='Number of epsiodes of the MDP to run (default %default)')
@@ -408,7 +510,7 @@ def parseOptions():
                          help='Request a window width of X pixels *per grid cell* (default %default)')
     optParser.add_option('-a', '--agent',action='store', metavar="A",
                          type='string',dest='agent',default="random",
-                         help='Agent type (options are \'random\', \'value\' and \'q\', default %default)')
+                         help='Agent type (options are \'random\', \'value\', \'vectorvalue\', \'policy\', \'modifiedpolicy\' and \'q\', default %default)')
     optParser.add_option('-t', '--text',action='store_true',
                          dest='textDisplay',default=False,
                          help='Use text-only ASCII display')
@@ -514,8 +616,17 @@ if __name__ == '__main__':
         a = valueIterationAgents.AsynchronousValueIterationAgent(mdp, opts.discount, opts.iters)
     elif opts.agent == 'priosweepvalue':
         a = valueIterationAgents.PrioritizedSweepingValueIterationAgent(mdp, opts.discount, opts.iters)
+    elif opts.agent == 'vectorvalue':
+        a = valueIterationAgents.VectorizedValueIterationAgent(mdp, opts.discount, opts.iters, opts.tolerance)
+    elif opts.agent == 'policy':
+        a = valueIterationAgents.PolicyIterationAgent(mdp, opts.discount, opts.iters, opts.evaluation)
+    elif opts.agent == 'modifiedpolicy':
+        a = valueIterationAgents.ModifiedPolicyIterationAgent(mdp, opts.discount, opts.iters,
+                                                              opts.evaluationSweeps, opts.tolerance)
     else:
         if not opts.manual: raise Exception('Unknown agent type: '+opts.agent)
+    if hasattr(a, 'residual'):
+        print('%d backups, residual %g' % (a.backups, a.residual))
 
 
     ###########################
@@ -523,16 +634,18 @@ if __name__ == '__main__':
     ###########################
     # DISPLAY Q/V VALUES BEFORE SIMULATION OF EPISODES
     try:
-        if not opts.manual and opts.agent in ('value', 'asynchvalue', 'priosweepvalue'):
+        if not opts.manual and opts.agent in VALUE_AGENTS:
             if opts.valueSteps:
                 for i in range(opts.iters):
                     tempAgent = valueIterationAgents.ValueIterationAgent(mdp, opts.discount, i)
                     display.displayValues(tempAgent, message = "VALUES AFTER "+str(i)+" ITERATIONS")
                     display.pause()
 
-            display.displayValues(a, message = "VALUES AFTER "+str(opts.iters)+" ITERATIONS")
+            # vectorvalue can stop early, and policy iteration counts its own iterations
+            iterationsRun = getattr(a, 'iterationsRun', opts.iters)
+            display.displayValues(a, message = "VALUES AFTER "+str(iterationsRun)+" ITERATIONS")
             display.pause()
-            display.displayQValues(a, message = "Q-VALUES AFTER "+str(opts.iters)+" ITERATIONS")
+            display.displayQValues(a, message = "Q-VALUES AFTER "+str(iterationsRun)+" ITERATIONS")
             display.pause()
     except KeyboardInterrupt:
         sys.exit(0)
@@ -545,7 +658,7 @@ if __name__ == '__main__':
         if opts.manual and opts.agent == None:
             displayCallback = lambda state: display.displayNullValues(state)
         else:
-            if opts.agent in ('random', 'value', 'asynchvalue', 'priosweepvalue'):
+            if opts.agent == 'random' or opts.agent in VALUE_AGENTS:
                 displayCallback = lambda state: display.displayValues(a, state, "CURRENT VALUES")
             if opts.agent == 'q': displayCallback = lambda state: display.displayQValues(a, state, "CURRENT Q-VALUES")
 
@@ -16,7 +16,6 @@ from util import manhattanDistance
 from game import Grid
 import os
 import random
-from functools import reduce
 
 VISIBILITY_MATRIX_CACHE = {}
 
@@ -24,6 +23,11 @@ VISIBILITY_MATRIX_CACHE = {}
 class Layout:
     """
     A Layout manages the static information about the game board.
+
+    Layouts are not changed once parsed: getLayout hands out copies that
+    share one parsed Layout per file.  wallMask and foodMask are ints with
+    bit x * height + y set for each wall and food cell; they are computed
+    the first time they are read and shared with every copy.
     """
 
     def __init__(self, layoutText):
@@ -35,22 +39,37 @@ class Layout:
         self.agentPositions = []
         self.numGhosts = 0
         self.processLayoutText(layoutText)
-        self.layoutText = layoutText
+        self.layoutText = tuple(layoutText)
         self.totalFood = len(self.food.asList())
+        self.masks = {}   # grid name -> bitmask, shared by the copies
         # self.initializeVisibilityMatrix()
 
+    def cellMask(self, name):
+        if name not in self.masks:
+            self.masks[name] = int(getattr(self, name)._cellDigits()[::-1] or '0', 2)
+        return self.masks[name]
+
+    def getWallMask(self):
+        return self.cellMask('walls')
+    wallMask = property(getWallMask)
+
+    def getFoodMask(self):
+        return self.cellMask('food')
+    foodMask = property(getFoodMask)
+
     def getNumGhosts(self):
         return self.numGhosts
 
     def initializeVisibilityMatrix(self):
         global VISIBILITY_MATRIX_CACHE
-        if reduce(str.__add__, self.layoutText) not in VISIBILITY_MATRIX_CACHE:
+        if self.layoutText not in VISIBILITY_MATRIX_CACHE:
             from game import Directions
             vecs = [(-0.5, 0), (0.5, 0), (0, -0.5), (0, 0.5)]
             dirs = [Directions.NORTH, Directions.SOUTH,
                     Directions.WEST, Directions.EAST]
-            vis = Grid(self.width, self.height, {Directions.NORTH: set(), Directions.SOUTH: set(
-            ), Directions.EAST: set(), Directions.WEST: set(), Directions.STOP: set()})
+            # Grids only hold booleans, so the matrix is a list of columns
+            vis = [[dict((direction, set()) for direction in dirs + [Directions.STOP])
+                    for y in range(self.height)] for x in range(self.width)]
             for x in range(self.width):
                 for y in range(self.height):
                     if self.walls[x][y] == False:
@@ -59,12 +78,9 @@ class Layout:
                             nextx, nexty = x + dx, y + dy
                             while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)]:
                                 vis[x][y][direction].add((nextx, nexty))
-                                nextx, nexty = x + dx, y + dy
-            self.visibility = vis
-            VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
-        else:
-            self.visibility = VISIBILITY_MATRIX_CACHE[reduce(
-                str.__add__, self.layoutText)]
+                                nextx, nexty = nextx + dx, nexty + dy
+            VISIBILITY_MATRIX_CACHE[self.layoutText] = vis
+        self.visibility = VISIBILITY_MATRIX_CACHE[self.layoutText]
 
     def isWall(self, pos):
         x, col = pos
@@ -97,7 +113,13 @@ class Layout:
         return "\n".join(self.layoutText)
 
     def deepCopy(self):
-        return Layout(self.layoutText[:])
+        """
+        Layouts are never changed after parsing, so a copy shares the grids
+        and text of the original instead of parsing the text again.
+        """
+        layout = Layout.__new__(Layout)
+        layout.__dict__.update(self.__dict__)
+        return layout
 
     def processLayoutText(self, layoutText):
         """
@@ -137,28 +159,92 @@ class Layout:
             self.numGhosts += 1
 
 
+_layoutFiles = {}     # directory -> names of the files in it
+_layoutPaths = {}     # (name, back, working directory) -> layout file
+_parsedLayouts = {}   # layout file -> Layout
+_textLayouts = {}     # layout text -> Layout
+
+
+def clearLayoutCache():
+    "Forgets every scanned directory and parsed layout"
+    _layoutFiles.clear()
+    _layoutPaths.clear()
+    _parsedLayouts.clear()
+    _textLayouts.clear()
+
+
+def _findFile(fullname):
+    """
+    The absolute path of fullname if it exists.  Each directory is listed
+    once rather than probed on every lookup; a name missing from the
+    listing is checked on disk, so files added since are still found.
+    """
+    path = os.path.abspath(fullname)
+    directory, name = os.path.split(path)
+    if directory not in _layoutFiles:
+        try:
+            _layoutFiles[directory] = set(os.listdir(directory))
+        except OSError:
+            _layoutFiles[directory] = set()
+    if name in _layoutFiles[directory]:
+        return path
+    if os.path.exists(path):
+        _layoutFiles[directory].add(name)
+        return path
+    return None
+
+
+def findLayoutFile(name, back=2):
+    """
+    The file getLayout loads for name: layouts/name.lay or name.lay in the
+    current directory, or in one of its parents up to back + 1 levels up.
+    Only names that were found are remembered.
+    """
+    if not name.endswith('.lay'):
+        name = name + '.lay'
+    key = (name, back, os.getcwd())
+    if key in _layoutPaths:
+        return _layoutPaths[key]
+    directory = key[2]
+    for level in range(max(back + 2, 1)):
+        path = _findFile(os.path.join(directory, 'layouts', name))
+        if path == None:
+            path = _findFile(os.path.join(directory, name))
+        if path != None:
+            _layoutPaths[key] = path
+            return path
+        directory = os.path.dirname(directory)
+    return None
+
+
 def getLayout(name, back=2):
-    if name.endswith('.lay'):
-        layout = tryToLoad('layouts/' + name)
-        if layout == None:
-            layout = tryToLoad(name)
-    else:
-        layout = tryToLoad('layouts/' + name + '.lay')
-        if layout == None:
-            layout = tryToLoad(name + '.lay')
-    if layout == None and back >= 0:
-        curdir = os.path.abspath('.')
-        os.chdir('..')
-        layout = getLayout(name, back - 1)
-        os.chdir(curdir)
-    return layout
+    path = findLayoutFile(name, back)
+    if path == None:
+        return None
+    return loadLayout(path)
+
+
+def loadLayout(path):
+    "A copy of the layout in a file, which is read only the first time"
+    if path not in _parsedLayouts:
+        f = open(path)
+        try:
+            _parsedLayouts[path] = layoutFromText([line.strip() for line in f])
+        finally:
+            f.close()
+    return _parsedLayouts[path].deepCopy()
+
+
+def layoutFromText(layoutText):
+    "A copy of the layout of a list of rows, parsed once per distinct text"
+    key = tuple(layoutText)
+    if key not in _textLayouts:
+        _textLayouts[key] = Layout(list(key))
+    return _textLayouts[key].deepCopy()
 
 
 def tryToLoad(fullname):
-    if(not os.path.exists(fullname)):
+    path = _findFile(fullname)
+    if path == None:
         return None
-    f = open(fullname)
-    try:
-        return Layout([line.strip() for line in f])
-    finally:
-        f.close()
+    return loadLayout(path)
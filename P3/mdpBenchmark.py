@@ -0,0 +1,292 @@
+# mdpBenchmark.py
+# ---------------
+# Licensing Information:  You are free to use or extend these projects for
+# educational purposes provided that (1) you do not distribute or publish
+# solutions, (2) you retain this notice, and (3) you provide clear
+# attribution to UC Berkeley, including a link to http://ai.berkeley.edu.
+#
+# Attribution Information: The Pacman AI projects were developed at UC Berkeley.
+# The core projects and autograders were primarily created by John DeNero
+# (denero@cs.berkeley.edu) and Dan Klein (klein@cs.berkeley.edu).
+# Student side autograding was added by Brad Miller, Nick Hay, and
+# Pieter Abbeel (pabbeel@cs.berkeley.edu).
+
+
+"""
+Compares the MDP solvers of valueIterationAgents.py on gridworlds: the
+built-in ones and random ones of growing size from gridworld.generateGrid.
+
+Every solver is asked for values within epsilon of the optimal values V*:
+the iterative ones stop once no value changes by more than
+epsilon * (1 - discount) / discount, which bounds their error by epsilon.
+Each run reports the wall time (the fastest of --repeat runs), the peak
+memory (from a separate run under tracemalloc), the sweeps used (passes
+over every state; for the one-state-at-a-time solvers, backups divided by
+the number of states), the Bellman backups, the error actually left and
+the policy agreement: the fraction of non-terminal states whose action is
+optimal under V*.  On big grids the Q-values of states far from the
+exits differ by less than epsilon, so agreement there is down to chance.
+policy counts only its improvement sweeps; each of them also takes a
+sparse linear solve.  V* is found by value iteration run to 1e-12.
+
+Once a solver takes longer than --timeLimit on a grid, it is skipped on
+the bigger grids after it.  To track a change, save the results of one
+run and pass them to the next:
+
+> python mdpBenchmark.py -z 20,40,80,160 -o before.json
+  (change valueIterationAgents.py)
+> python mdpBenchmark.py -z 20,40,80,160 -c before.json
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+
+from compiledMdp import CompiledMDP
+import gridworld
+import valueIterationAgents
+
+def builtinGrids():
+    return sorted([name[3:] for name in dir(gridworld)
+                   if name.startswith('get') and name.endswith('Grid') and name != 'getRandomGrid'])
+
+def sweepsOfIterations(mdp, discount, tolerance):
+    "How many synchronous value iteration sweeps reach the tolerance"
+    agent = valueIterationAgents.VectorizedValueIterationAgent(mdp, discount, 10 ** 6, tolerance)
+    return agent.iterationsRun
+
+# Each solver returns a function that builds the agent, so that the timed
+# and traced runs leave out any setup, and a function giving the sweeps
+# the built agent used.
+
+def runValue(mdp, discount, tolerance, numStates):
+    iterations = sweepsOfIterations(mdp, discount, tolerance)
+    return (lambda: valueIterationAgents.ValueIterationAgent(mdp, discount, iterations),
+            lambda agent: iterations)
+
+def runAsynchValue(mdp, discount, tolerance, numStates):
+    iterations = sweepsOfIterations(mdp, discount, tolerance) * numStates
+    return (lambda: valueIterationAgents.AsynchronousValueIterationAgent(mdp, discount, iterations),
+            lambda agent: iterations / float(numStates))
+
+def runPrioritizedSweeping(mdp, discount, tolerance, numStates):
+    return (lambda: valueIterationAgents.PrioritizedSweepingValueIterationAgent(
+                mdp, discount, 1000 * numStates, tolerance),
+            lambda agent: agent.backups / float(numStates))
+
+def runVectorValue(mdp, discount, tolerance, numStates):
+    return (lambda: valueIterationAgents.VectorizedValueIterationAgent(mdp, discount, 10 ** 6, tolerance),
+            lambda agent: agent.iterationsRun)
+
+def runPolicy(mdp, discount, tolerance, numStates):
+    # import SciPy before the clock starts
+    import scipy.sparse.linalg
+    return (lambda: valueIterationAgents.PolicyIterationAgent(mdp, discount, 10 ** 6, 'solve'),
+            lambda agent: agent.sweeps)
+
+def runPolicySweeps(mdp, discount, tolerance, numStates):
+    return (lambda: valueIterationAgents.PolicyIterationAgent(mdp, discount, 10 ** 6, 'sweeps', tolerance),
+            lambda agent: agent.sweeps)
+
+def runModifiedPolicy(mdp, discount, tolerance, numStates):
+    return (lambda: valueIterationAgents.ModifiedPolicyIterationAgent(mdp, discount, 10 ** 6, 5, tolerance),
+            lambda agent: agent.sweeps)
+
+# (name, function(mdp, discount, tolerance, numStates) -> (build, sweeps))
+SOLVERS = [
+    ('value', runValue),
+    ('asynchvalue', runAsynchValue),
+    ('priosweepvalue', runPrioritizedSweeping),
+    ('vectorvalue', runVectorValue),
+    ('policy', runPolicy),
+    ('policysweeps', runPolicySweeps),
+    ('modifiedpolicy', runModifiedPolicy),
+]
+
+def optimalValues(mdp, discount):
+    agent = valueIterationAgents.VectorizedValueIterationAgent(mdp, discount, 10 ** 6, 1e-12)
+    return agent.values
+
+def optimalQValues(compiled, best, discount):
+    "The Q-value under V* of every row of the compiled MDP"
+    values = compiled.numpy.array([best[state] for state in compiled.states])
+    return compiled.qValues(values, discount).tolist()
+
+def policyAgreement(agent, compiled, optimalQ):
+    """
+    The fraction of non-terminal states where the agent's action is optimal,
+    that is within 1e-9 of the best Q-value under V*.  Ties count as
+    agreement whichever of the tied actions the agent picked.
+    """
+    agreed = 0
+    for i in compiled.actingStates.tolist():
+        first = int(compiled.pairStart[i])
+        last = first
+        while last < compiled.numPairs and compiled.pairState[last] == i:
+            last += 1
+        action = agent.getPolicy(compiled.states[i])
+        rows = [row for row in range(first, last) if compiled.pairActions[row] == action]
+        best = max(optimalQ[first:last])
+        if rows and optimalQ[rows[0]] >= best - 1e-9 * max(1.0, abs(best)):
+            agreed += 1
+    return agreed / float(max(len(compiled.actingStates), 1))
+
+def runSolver(solver, mdp, discount, tolerance, repeat=1):
+    """
+    Runs one solver and returns (agent, seconds, sweeps, peakBytes).  The
+    timed runs and the memory run are kept apart so that tracemalloc does
+    not skew the timing.
+    """
+    build, countSweeps = solver(mdp, discount, tolerance, len(mdp.getStates()))
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        agent = build()
+        elapsed = time.perf_counter() - start
+        if best == None or elapsed < best: best = elapsed
+
+    tracemalloc.start()
+    build()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return agent, best, countSweeps(agent), peak
+
+def benchmarkGrid(name, mdp, discount, epsilon, solverNames, repeat=1, skip=()):
+    """
+    Runs the named solvers on one gridworld and returns a dict of
+    measurements for each.  Solvers in skip, or whose dependencies are
+    missing, are reported with a note instead.
+    """
+    states = mdp.getStates()
+    tolerance = epsilon * (1 - discount) / discount
+    best = optimalValues(mdp, discount)
+    compiled = CompiledMDP(mdp)
+    optimalQ = optimalQValues(compiled, best, discount)
+    results = []
+    for solverName, solver in SOLVERS:
+        if solverName not in solverNames:
+            continue
+        result = {'grid': name, 'solver': solverName, 'states': len(states),
+                  'discount': discount, 'epsilon': epsilon}
+        if solverName in skip:
+            result['skipped'] = 'too slow on a smaller grid'
+            results.append(result)
+            continue
+        try:
+            agent, seconds, sweeps, peak = runSolver(solver, mdp, discount, tolerance, repeat)
+        except ImportError as e:
+            result['skipped'] = str(e)
+            results.append(result)
+            continue
+        backups = getattr(agent, 'backups', None)
+        if backups == None:
+            backups = int(round(sweeps * len(compiled.actingStates)))
+        result.update({'seconds': seconds, 'peakBytes': peak, 'sweeps': sweeps, 'backups': backups,
+                       'error': max([abs(agent.getValue(state) - best[state]) for state in states]),
+                       'policyAgreement': policyAgreement(agent, compiled, optimalQ)})
+        results.append(result)
+    return results
+
+def resultKey(result):
+    return '%s/%s' % (result['grid'], result['solver'])
+
+def printHeader(baseline=None):
+    header = '%-14s %-15s %7s %9s %10s %10s %10s %9s %8s' % (
+        'grid', 'solver', 'states', 'seconds', 'peak KiB', 'sweeps', 'backups', 'error', 'policy')
+    if baseline != None: header += ' %8s %8s' % ('speedup', 'mem')
+    print(header)
+
+def printResult(result, baseline=None):
+    if 'skipped' in result:
+        print('%-14s %-15s %7d skipped: %s' % (result['grid'], result['solver'], result['states'],
+                                               result['skipped']))
+        return
+    line = '%-14s %-15s %7d %9.4f %10.1f %10.1f %10d %9.2g %8.4f' % (
+        result['grid'], result['solver'], result['states'], result['seconds'],
+        result['peakBytes'] / 1024.0, result['sweeps'], result['backups'], result['error'],
+        result['policyAgreement'])
+    old = baseline.get(resultKey(result)) if baseline != None else None
+    if old != None and 'skipped' not in old:
+        line += ' %7.2fx %7.2fx' % (old['seconds'] / max(result['seconds'], 1e-9),
+                                    old['peakBytes'] / float(max(result['peakBytes'], 1)))
+    print(line)
+
+def makeGrids(options):
+    "(name, gridworld) for each of the -g grids, then each of the -z sizes"
+    grids = [(name, getattr(gridworld, 'get' + name)()) for name in options.grids]
+    for size in options.sizes:
+        grid = gridworld.Gridworld(gridworld.generateGrid(size, size, options.wallDensity,
+                                                          options.exitRewards, options.seed))
+        grids.append(('Random%dx%d' % (size, size), grid))
+    for name, grid in grids:
+        grid.setNoise(options.noise)
+        grid.setLivingReward(options.livingReward)
+    return grids
+
+def readCommand(argv):
+    from optparse import OptionParser
+    parser = OptionParser('USAGE: python mdpBenchmark.py <options>')
+    parser.add_option('-g', '--grids', dest='grids', default=','.join(builtinGrids()),
+                      help='Comma separated gridworlds; empty for none [Default: %default]')
+    parser.add_option('-z', '--sizes', dest='sizes', default='10,20,40',
+                      help='Comma separated sizes of random square gridworlds to add [Default: %default]')
+    parser.add_option('-w', '--wallDensity', dest='wallDensity', type='float', default=0.2,
+                      help='Chance of a wall in each cell of the random gridworlds [Default: %default]')
+    parser.add_option('-x', '--exitRewards', dest='exitRewards', default='10,-10',
+                      help='Comma separated rewards of the exits of the random gridworlds [Default: %default]')
+    parser.add_option('--seed', dest='seed', type='int', default=0,
+                      help='Seed of the random gridworlds [Default: %default]')
+    parser.add_option('-s', '--solvers', dest='solvers', default=','.join([name for name, solver in SOLVERS]),
+                      help='Comma separated solvers [Default: %default]')
+    parser.add_option('-d', '--discount', dest='discount', type='float', default=0.9,
+                      help='Discount on future [Default: %default]')
+    parser.add_option('-n', '--noise', dest='noise', type='float', default=0.2,
+                      help='How often actions go in an unintended direction [Default: %default]')
+    parser.add_option('-r', '--livingReward', dest='livingReward', type='float', default=0.0,
+                      help='Reward for living for a time step [Default: %default]')
+    parser.add_option('-e', '--epsilon', dest='epsilon', type='float', default=1e-4,
+                      help='Largest error allowed in the values [Default: %default]')
+    parser.add_option('-p', '--repeat', dest='repeat', type='int', default=1,
+                      help='Timed runs per solver; the fastest is reported [Default: %default]')
+    parser.add_option('-t', '--timeLimit', dest='timeLimit', type='float', default=30.0,
+                      help='Skip a solver on later grids once a run takes longer [Default: %default]')
+    parser.add_option('-o', '--output', dest='output', default=None,
+                      help='Write the results as JSON to this file')
+    parser.add_option('-c', '--compare', dest='compare', default=None,
+                      help='JSON results of an earlier run to compare against')
+    options, otherjunk = parser.parse_args(argv)
+    if len(otherjunk) != 0:
+        raise Exception('Command line input not understood: ' + str(otherjunk))
+    if options.repeat < 1:
+        raise Exception('--repeat must be at least 1')
+    options.grids = [name for name in options.grids.split(',') if name]
+    options.sizes = [int(size) for size in options.sizes.split(',') if size]
+    options.exitRewards = [float(reward) for reward in options.exitRewards.split(',') if reward]
+    options.solvers = options.solvers.split(',')
+    for solverName in options.solvers:
+        if solverName not in [name for name, solver in SOLVERS]:
+            raise Exception('Unknown solver: ' + solverName)
+    return options
+
+if __name__ == '__main__':
+    options = readCommand(sys.argv[1:])
+    baseline = None
+    if options.compare != None:
+        with open(options.compare) as f:
+            baseline = dict((resultKey(result), result) for result in json.load(f))
+
+    printHeader(baseline)
+    results = []
+    slow = set()
+    for name, mdp in makeGrids(options):
+        for result in benchmarkGrid(name, mdp, options.discount, options.epsilon,
+                                    options.solvers, options.repeat, slow):
+            printResult(result, baseline)
+            results.append(result)
+            if result.get('seconds', 0) > options.timeLimit:
+                slow.add(result['solver'])
+
+    if options.output != None:
+        with open(options.output, 'w') as f:
+            json.dump(results, f, indent=2)
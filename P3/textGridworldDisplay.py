@@ -256,6 +256,7 @@ def border(text):
 # (http://aspn.activestate.com/ASPN/Cookbook/Python/Recipe/267662)
 
 import io,operator
+from itertools import zip_longest
 
 def indent(rows, hasHeader=False, headerChar='-', delim=' | ', justify='left',
            separateRows=False, prefix='', postfix='', wrapfunc=lambda x:x):
@@ -276,11 +277,11 @@ def indent(rows, hasHeader=False, headerChar='-', delim=' | ', justify='left',
     # closure for breaking logical rows to physical, using wrapfunc
     def rowWrapper(row):
         newRows = [wrapfunc(item).split('\n') for item in row]
-        return [[substr or '' for substr in item] for item in list(*newRows)]
+        return [[substr or '' for substr in item] for item in zip_longest(*newRows)]
     # break each logical row into one or more physical ones
     logicalRows = [rowWrapper(row) for row in rows]
     # columns of physical rows
-    columns = list(*reduce(operator.add,logicalRows))
+    columns = list(zip_longest(*reduce(operator.add,logicalRows)))
     # get the maximum of each column by the string length of its items
     maxWidths = [max([len(str(item)) for item in column]) for column in columns]
     rowSeparator = headerChar * (len(prefix) + len(postfix) + sum(maxWidths) + \
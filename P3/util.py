@@ -242,6 +242,86 @@ class PriorityQueue:
             self.push(item, priority)
 
 
+class IndexedPriorityQueue:
+    """
+    A priority queue holding each item at most once, with the semantics of
+    PriorityQueue.update: updating an item lowers its priority if the new
+    one is lower and otherwise does nothing.  The heap position of every
+    item is kept, so update and pop take O(log n) time.  Items with equal
+    priority come out in the order they were first pushed.  Items must be
+    hashable.
+    """
+
+    def __init__(self):
+        self.heap = []      # (priority, count, item) entries
+        self.positions = {} # item -> index of its entry in heap
+        self.count = 0
+
+    def __len__(self):
+        return len(self.heap)
+
+    def __contains__(self, item):
+        return item in self.positions
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def push(self, item, priority):
+        self.update(item, priority)
+
+    def update(self, item, priority):
+        position = self.positions.get(item)
+        if position == None:
+            self.heap.append((priority, self.count, item))
+            self.count += 1
+            self._siftUp(len(self.heap) - 1)
+        elif priority < self.heap[position][0]:
+            self.heap[position] = (priority, self.heap[position][1], item)
+            self._siftUp(position)
+
+    def pop(self):
+        last = self.heap.pop()
+        if len(self.heap) == 0:
+            del self.positions[last[2]]
+            return last[2]
+        top = self.heap[0]
+        del self.positions[top[2]]
+        self.heap[0] = last
+        self._siftDown(0)
+        return top[2]
+
+    def _siftUp(self, position):
+        heap = self.heap
+        entry = heap[position]
+        while position > 0:
+            parent = (position - 1) >> 1
+            if heap[parent] <= entry:
+                break
+            heap[position] = heap[parent]
+            self.positions[heap[position][2]] = position
+            position = parent
+        heap[position] = entry
+        self.positions[entry[2]] = position
+
+    def _siftDown(self, position):
+        heap = self.heap
+        size = len(heap)
+        entry = heap[position]
+        while True:
+            child = 2 * position + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry <= heap[child]:
+                break
+            heap[position] = heap[child]
+            self.positions[heap[position][2]] = position
+            position = child
+        heap[position] = entry
+        self.positions[entry[2]] = position
+
+
 class PriorityQueueWithFunction(PriorityQueue):
     """
     Implements a priority queue with the same push/pop signature of the
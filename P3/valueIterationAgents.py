@@ -158,6 +158,9 @@ class PrioritizedSweepingValueIterationAgent(AsynchronousValueIterationAgent):
         A PrioritizedSweepingValueIterationAgent takes a Markov decision process
         (see mdp.py) on initialization and runs prioritized sweeping value iteration
         for a given number of iterations using the supplied parameters.
+
+        backups counts the states updated, and residual is the largest
+        change one more backup of any state would make.
     """
     def __init__(self, mdp, discount = 0.9, iterations = 100, theta = 1e-5):
         """
@@ -170,53 +173,189 @@ class PrioritizedSweepingValueIterationAgent(AsynchronousValueIterationAgent):
 
     def runValueIteration(self):
         "*** YOUR CODE HERE ***"
-        predecessor={}
-        # for all the states find the predecessor
-        for state in self.mdp.getStates():
+        states=self.mdp.getStates()
+        # predecessors[s]: the states with a nonzero chance of reaching s,
+        # in getStates order.  A state's transitions are all listed before
+        # the next state's, so a repeat is always the last one added.
+        predecessors=dict((state,[]) for state in states)
+        for state in states:
             if self.mdp.isTerminal(state):
-                # terminal state, do not have a predecessor
+                # terminal state, is nobody's predecessor
                 continue
-            else:
-                for action in self.mdp.getPossibleActions(state):
-                    for next_state,prob in self.mdp.getTransitionStatesAndProbs(state,action):
-                        # not in predecessor dict, add state
-                        if next_state not in predecessor:
-                            predecessor[next_state]={state}
-                        else:
-                            predecessor[next_state].add(state)
-        priqueue=util.PriorityQueue() # create a priority queue
-        for state in self.mdp.getStates():
+            for action in self.mdp.getPossibleActions(state):
+                for next_state,prob in self.mdp.getTransitionStatesAndProbs(state,action):
+                    pre=predecessors[next_state]
+                    if prob>0 and (len(pre)==0 or pre[-1]!=state):
+                        pre.append(state)
+        priqueue=util.IndexedPriorityQueue() # O(log n) update
+        for state in states:
             if self.mdp.isTerminal(state):
                 continue
-            qvalues=list()
-            # to find the largest qvalue
-            for action in self.mdp.getPossibleActions(state):
-                qvalue=self.computeQValueFromValues(state,action)
-                qvalues.append(qvalue)
-            diff=abs(self.values[state]-max(qvalues)) 
-            # compute the difference
+            diff=abs(self.values[state]-self.maxQValue(state))
             priqueue.update(state,-diff)
-        
+
+        self.backups=0
         for k in range(self.iterations):
             if(priqueue.isEmpty()):
                 break
             s=priqueue.pop()
             if not self.mdp.isTerminal(s):
                 # update s value if not terminal
-                qvalues=list()
-                for action in self.mdp.getPossibleActions(s):
-                    qvalue=self.computeQValueFromValues(s,action)
-                    qvalues.append(qvalue)
-                self.values[s]=max(qvalues)
-            for pre in predecessor:
-                if self.mdp.isTerminal(pre):
-                    continue
-                qvalues=list()
-                # comput diff of max(qvalue) self.values
-                for action in self.mdp.getPossibleActions(pre):
-                    qvalue=self.computeQValueFromValues(pre,action)
-                    qvalues.append(qvalue)
-                diff=abs(self.values[pre]-max(qvalues))
+                self.values[s]=self.maxQValue(s)
+                self.backups+=1
+            # only the predecessors of s can have changed
+            for pre in predecessors[s]:
+                diff=abs(self.values[pre]-self.maxQValue(pre))
                 if diff>self.theta:
                     # push pre into pq
-                    priqueue.update(pre,-diff)
\ No newline at end of file
+                    priqueue.update(pre,-diff)
+        # the largest change one more backup of any state would make
+        self.residual=0.0
+        for state in states:
+            if not self.mdp.isTerminal(state):
+                self.residual=max(self.residual,abs(self.values[state]-self.maxQValue(state)))
+
+    def maxQValue(self, state):
+        return max([self.computeQValueFromValues(state,action)
+                    for action in self.mdp.getPossibleActions(state)])
+
+class VectorizedValueIterationAgent(ValueIterationAgent):
+    """
+        Value iteration on the array form of the MDP (see compiledMdp.py):
+        every iteration backs up all states at once with NumPy.  It stops
+        after the given number of iterations, or earlier once no value
+        changes by more than tolerance in an iteration.
+
+        iterationsRun, backups (states updated) and residual (the largest
+        change in the last iteration) are kept for reporting.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, tolerance = 0.0):
+        self.tolerance = tolerance
+        ValueIterationAgent.__init__(self, mdp, discount, iterations)
+
+    def runValueIteration(self):
+        import compiledMdp
+        compiled = compiledMdp.CompiledMDP(self.mdp)
+        values = compiled.zeroValues()
+        self.iterationsRun = 0
+        self.backups = 0
+        self.residual = 0.0
+        for i in range(self.iterations):
+            newValues = compiled.backup(values, self.discount)
+            self.residual = float(abs(newValues - values).max()) if compiled.numStates else 0.0
+            values = newValues
+            self.iterationsRun += 1
+            self.backups += len(compiled.actingStates)
+            if self.residual <= self.tolerance:
+                break
+        self.values = compiled.valuesToCounter(values)
+        self.policy = dict(zip(compiled.states, compiled.greedyPolicy(values, self.discount)))
+
+    def computeActionFromValues(self, state):
+        return self.policy[state]
+
+class PolicyIterationAgent(ValueIterationAgent):
+    """
+        Policy iteration on the array form of the MDP (see compiledMdp.py).
+        Starting from the greedy policy after one backup, it alternates
+        evaluating the policy and making it greedy, for at most the given
+        number of iterations or until the policy stops changing.
+
+        evaluation is 'solve', a sparse linear solve of the policy's Bellman
+        equations (needs SciPy), or 'sweeps', evaluation sweeps until no
+        value changes by more than tolerance.  A policy that never reaches
+        an exit has no finite values when discount is 1, so sweeps stop
+        after evaluationLimit and a solve that is not finite falls back to
+        them.
+
+        iterationsRun, sweeps (passes over every state), backups and
+        residual (the largest change one more value iteration backup would
+        make) are kept for reporting.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, evaluation = 'solve', tolerance = 1e-10,
+                 evaluationLimit = 10000):
+        if evaluation not in ('solve', 'sweeps'):
+            raise Exception('Unknown policy evaluation: ' + str(evaluation))
+        self.evaluation = evaluation
+        self.tolerance = tolerance
+        self.evaluationLimit = evaluationLimit
+        ValueIterationAgent.__init__(self, mdp, discount, iterations)
+
+    def runValueIteration(self):
+        import compiledMdp
+        compiled = compiledMdp.CompiledMDP(self.mdp)
+        self.iterationsRun = 0
+        self.sweeps = 0
+        policyRows = compiled.startingRows(self.discount)
+        values = compiled.zeroValues()
+        for i in range(self.iterations):
+            values = self.evaluatePolicy(compiled, policyRows, values)
+            qValues = compiled.qValues(values, self.discount)
+            self.sweeps += 1
+            self.iterationsRun += 1
+            newRows = compiled.improvedRows(policyRows, qValues)
+            if (newRows == policyRows).all():
+                break
+            policyRows = newRows
+        self.finish(compiled, values)
+
+    def evaluatePolicy(self, compiled, policyRows, values):
+        "The values of the policy, starting the sweeps from values"
+        policyModel = compiled.policyModel(policyRows)
+        if self.evaluation == 'solve':
+            solved = compiled.solvePolicy(policyModel, self.discount)
+            if compiled.numpy.isfinite(solved).all():
+                return solved
+        for sweep in range(self.evaluationLimit):
+            newValues = compiled.evaluationSweep(policyModel, values, self.discount)
+            self.sweeps += 1
+            change = float(abs(newValues - values).max()) if compiled.numStates else 0.0
+            values = newValues
+            if change <= self.tolerance:
+                break
+        return values
+
+    def finish(self, compiled, values):
+        "Stores the values, their greedy policy and the statistics"
+        best = compiled.backup(values, self.discount)
+        self.residual = float(abs(best - values).max()) if compiled.numStates else 0.0
+        self.backups = self.sweeps * len(compiled.actingStates)
+        self.values = compiled.valuesToCounter(values)
+        self.policy = dict(zip(compiled.states, compiled.greedyPolicy(values, self.discount)))
+
+    def computeActionFromValues(self, state):
+        return self.policy[state]
+
+class ModifiedPolicyIterationAgent(PolicyIterationAgent):
+    """
+        Modified policy iteration: the policy is made greedy for the current
+        values, which are then improved by only evaluationSweeps sweeps of
+        that policy.  One sweep per iteration is value iteration; many
+        approach policy iteration.  Stops after the given number of
+        iterations, or once no value iteration backup would change a value
+        by more than tolerance.
+    """
+    def __init__(self, mdp, discount = 0.9, iterations = 100, evaluationSweeps = 5, tolerance = 0.0):
+        self.evaluationSweeps = evaluationSweeps
+        PolicyIterationAgent.__init__(self, mdp, discount, iterations, 'sweeps', tolerance)
+
+    def runValueIteration(self):
+        import compiledMdp
+        compiled = compiledMdp.CompiledMDP(self.mdp)
+        self.iterationsRun = 0
+        self.sweeps = 0
+        policyRows = compiled.startingRows(self.discount)
+        values = compiled.zeroValues()
+        for i in range(self.iterations):
+            qValues = compiled.qValues(values, self.discount)
+            self.sweeps += 1
+            change = abs(compiled.maxByState(qValues) - values)
+            if compiled.numStates == 0 or float(change.max()) <= self.tolerance:
+                break
+            policyRows = compiled.improvedRows(policyRows, qValues)
+            policyModel = compiled.policyModel(policyRows)
+            for sweep in range(self.evaluationSweeps):
+                values = compiled.evaluationSweep(policyModel, values, self.discount)
+            self.sweeps += self.evaluationSweeps
+            self.iterationsRun += 1
+        self.finish(compiled, values)
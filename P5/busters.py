@@ -474,7 +474,7 @@ def readCommand( argv ):
     parser.add_option('-t', '--frameTime', dest='frameTime', type='float',
                       help=default('Time to delay between frames; <0 means keyboard'), default=0.1)
 
-    options, otherjunk = parser.parse_args()
+    options, otherjunk = parser.parse_args(argv)
     if len(otherjunk) != 0:
         raise Exception('Command line input not understood: ' + otherjunk)
     args = dict()
@@ -498,14 +498,31 @@ def readCommand( argv ):
     pacman = pacmanType(**agentOpts) # Instantiate Pacman with agentArgs
     args['pacman'] = pacman
 
-    import graphicsDisplay
-    args['display'] = graphicsDisplay.FirstPersonPacmanGraphics(options.zoom, \
-                                                                  options.showGhosts, \
-                                                                  frameTime = options.frameTime)
+    if options.quietGraphics:
+        args['display'] = NullGraphics()
+    else:
+        import graphicsDisplay
+        args['display'] = graphicsDisplay.FirstPersonPacmanGraphics(options.zoom, \
+                                                                      options.showGhosts, \
+                                                                      frameTime = options.frameTime)
     args['numGames'] = options.numGames
 
     return args
 
+class NullGraphics:
+    "A display that draws nothing, for games played with -q"
+    def initialize(self, state, isBlue = False):
+        pass
+
+    def update(self, state):
+        pass
+
+    def updateDistributions(self, distributions):
+        pass
+
+    def finish(self):
+        pass
+
 def loadAgent(pacman, nographics):
     # Looks through all pythonPath Directories for the right module,
     pythonPathStr = os.path.expandvars("$PYTHONPATH")
@@ -22,6 +22,10 @@ Example:
 distancer = Distancer(gameState.data.layout)
 distancer.getDistance( (1,1), (10,10) )
 
+Distance tables are also kept in an on-disk store keyed by a hash of the
+walls, so later processes memory-map the table instead of recomputing it
+(see loadDistances).
+
 The Distancer object also serves as an example of sharing data
 safely among agents via a global dictionary (distanceMap),
 and performing asynchronous computation via threads. These
@@ -31,6 +35,8 @@ distances.
 """
 
 import threading, sys, time, random
+import os, hashlib, mmap, tempfile
+import mazeDistances
 
 class Distancer:
   def __init__(self, layout, background=True, default=10000):
@@ -75,11 +81,16 @@ class Distancer:
     return bestDistance
 
   def getDistanceOnGrid(self, pos1, pos2):
-    key = (pos1, pos2)
-    if key in self._distances:
-      return self._distances[key]
-    else:
-      raise Exception("Positions not in grid: " + str(key))
+    cell1, cell2 = gridCell(pos1), gridCell(pos2)
+    if cell1 == None or cell2 == None:
+      raise Exception("Positions not in grid: " + str((pos1, pos2)))
+    try:
+      distance = self._distances.getDistance(cell1, cell2)
+    except Exception:
+      raise Exception("Positions not in grid: " + str((pos1, pos2)))
+    if distance == mazeDistances.UNREACHABLE:
+      return UNREACHABLE_DISTANCE
+    return distance
 
   def isReadyForMazeDistance(self):
     return self._distances != None
@@ -91,6 +102,15 @@ def isInt(pos):
   x, y = pos
   return x == int(x) and y == int(y)
 
+def gridCell(pos):
+  """
+  pos as a pair of ints if it is a grid point, which may be given as
+  whole-valued floats like (3.0, 4), or None for a point between cells.
+  """
+  if not isInt(pos):
+    return None
+  return (int(pos[0]), int(pos[1]))
+
 def getGrids2D(pos):
   grids = []
   for x, xDistance in getGrids1D(pos[0]):
@@ -109,6 +129,7 @@ def getGrids1D(x):
 ##########################################
 
 distanceMap = {}
+UNREACHABLE_DISTANCE = 1000000000 # reported for cells with no path between them
 distanceMapSemaphore = threading.Semaphore(1)
 distanceThread = None
 
@@ -131,7 +152,7 @@ class DistanceCalculator(threading.Thread):
       if distanceThread != None: raise Exception('Multiple distance threads')
       distanceThread = self
 
-      distances = computeDistances(self.layout)
+      distances = loadDistances(self.layout)
       #TODO:for oj
       # print('[Distancer]: Switching to maze distances',file=sys.stdout)
 
@@ -144,49 +165,91 @@ class DistanceCalculator(threading.Thread):
     self.distancer._distances = distances
 
 def computeDistances(layout):
-    distances = {}
-    allNodes = layout.walls.asList(False)
-    for source in allNodes:
-        dist = {}
-        closed = {}
-        for node in allNodes:
-            dist[node] = 1000000000
-        import util
-        queue = util.PriorityQueue()
-        queue.push(source, 0)
-        dist[source] = 0
-        while not queue.isEmpty():
-            node = queue.pop()
-            if node in closed:
-                continue
-            closed[node] = True
-            nodeDist = dist[node]
-            adjacent = []
-            x, y = node
-            if not layout.isWall((x,y+1)):
-                adjacent.append((x,y+1))
-            if not layout.isWall((x,y-1)):
-                adjacent.append((x,y-1) )
-            if not layout.isWall((x+1,y)):
-                adjacent.append((x+1,y) )
-            if not layout.isWall((x-1,y)):
-                adjacent.append((x-1,y))
-            for other in adjacent:
-                if not other in dist:
-                    continue
-                oldDist = dist[other]
-                newDist = nodeDist+1
-                if newDist < oldDist:
-                    dist[other] = newDist
-                    queue.push(other, newDist)
-        for target in allNodes:
-            distances[(target, source)] = dist[target]
+    """
+    Returns the all-pairs maze distances for the layout as a MazeDistances
+    table; a breadth first search from every open cell (see mazeDistances.py).
+    """
+    return mazeDistances.MazeDistances(layout.walls)
+
+##########################################
+# ON-DISK STORE FOR MAZE DISTANCE TABLES #
+##########################################
+
+# Each distinct set of walls is written here once as a flat binary file of
+# unsigned shorts and memory-mapped read-only afterwards, so concurrent
+# processes share one copy through the page cache.  Set the
+# PACMAN_DISTANCE_CACHE environment variable to move the store, or to an
+# empty string to turn it off.
+distanceStoreDir = os.environ.get('PACMAN_DISTANCE_CACHE',
+                                  os.path.join(tempfile.gettempdir(), 'pacman-distances'))
+
+def wallsKey(walls):
+    """
+    Returns a content hash of a wall Grid; equal walls share one stored table.
+    """
+    digest = hashlib.sha1()
+    digest.update(('v1 %d %d %s\n' % (walls.width, walls.height, sys.byteorder)).encode())
+    digest.update(''.join(['%' if wall else ' ' for column in walls.data for wall in column]).encode())
+    return digest.hexdigest()
+
+def loadDistances(layout):
+    """
+    Returns the MazeDistances for the layout, memory-mapped from the on-disk
+    store.  The first process to see a set of walls computes the table and
+    writes it; a missing, truncated or unwritable store falls back to
+    computing the distances in memory.
+    """
+    walls = layout.walls
+    if not distanceStoreDir or walls.count(False) == 0:
+        return computeDistances(layout)
+    path = os.path.join(distanceStoreDir, wallsKey(walls) + '.bin')
+    distances = readDistances(path, walls)
+    if distances == None:
+        distances = computeDistances(layout)
+        writeDistances(path, distances)
     return distances
 
+def readDistances(path, walls):
+    try:
+        f = open(path, 'rb')
+    except OSError:
+        return None
+    try:
+        numCells = walls.count(False)
+        if os.fstat(f.fileno()).st_size != numCells * numCells * 2:
+            return None
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    finally:
+        f.close()
+    return mazeDistances.MazeDistances(walls, memoryview(table).cast('H'))
+
+def writeDistances(path, distances):
+    # Written to a temporary file and renamed so readers never see a partial table
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmpPath = tempfile.mkstemp(dir=os.path.dirname(path))
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(distances.distances.tobytes())
+        os.chmod(tmpPath, 0o644)
+        os.replace(tmpPath, path)
+    except OSError:
+        try:
+            os.remove(tmpPath)
+        except OSError:
+            pass
 
-def getDistanceOnGrid(distances, pos1, pos2):
-    key = (pos1, pos2)
-    if key in distances:
-      return distances[key]
-    return 100000
 
+def getDistanceOnGrid(distances, pos1, pos2):
+    cell1, cell2 = gridCell(pos1), gridCell(pos2)
+    if cell1 == None or cell2 == None:
+      return 100000
+    try:
+      distance = distances.getDistance(cell1, cell2)
+    except Exception:
+      return 100000
+    if distance == mazeDistances.UNREACHABLE:
+      return UNREACHABLE_DISTANCE
+    return distance
@@ -173,9 +173,10 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(height)] for x in range(width)]
         if bitRepresentation:
-            self._unpackBits(bitRepresentation)
+            self._unpackBits(bitRepresentation, initialValue)
+        else:
+            self.data = [[initialValue for y in range(height)] for x in range(width)]
 
     def __getitem__(self, i):
         return self.data[i]
@@ -232,49 +233,76 @@ class Grid:
 
         (width, height, bitPackedInts...)
         """
+        digits = self._cellDigits()
+        size = self.CELLS_PER_INT
         bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
+        # The first cell of each int is its most significant bit
+        for start in range(0, (len(digits) // size + 1) * size, size):
+            bits.append(int(digits[start:start + size].ljust(size, '0'), 2))
         return tuple(bits)
 
+    def toBytes(self):
+        """
+        Returns a compact bytes representation: the width and height as two
+        little-endian 16 bit ints followed by one bit per cell, where cell
+        (x,y) is bit x * height + y.  See Grid.fromBytes.
+        """
+        numCells = self.width * self.height
+        packed = int(self._cellDigits()[::-1] or '0', 2)
+        return (self.width.to_bytes(2, 'little') + self.height.to_bytes(2, 'little') +
+                packed.to_bytes((numCells + 7) // 8, 'little'))
+
+    def fromBytes(data):
+        """
+        Rebuilds a Grid from the output of Grid.toBytes.
+        """
+        width = int.from_bytes(data[0:2], 'little')
+        height = int.from_bytes(data[2:4], 'little')
+        packed = int.from_bytes(data[4:], 'little')
+        grid = Grid(0, height)  # no columns yet; _setCellDigits fills them in
+        grid.width = width
+        grid._setCellDigits(format(packed, '0%db' % (width * height))[::-1])
+        return grid
+    fromBytes = staticmethod(fromBytes)
+
+    def _cellDigits(self):
+        """
+        Returns the cells as a string of '0' and '1' in cell index order.
+        """
+        cells = b''.join([bytes(column) for column in self.data])
+        return cells.translate(_CELLS_TO_DIGITS).decode('ascii')
+
+    def _setCellDigits(self, digits):
+        """
+        Fills in data from a string of '0' and '1' in cell index order.
+        """
+        cells = memoryview(digits.encode('ascii').translate(_DIGITS_TO_CELLS)).cast('?')
+        height = self.height
+        self.data = [cells[x * height:(x + 1) * height].tolist() for x in range(self.width)]
+
     def _cellIndexToPosition(self, index):
-        x = index / self.height
+        x = index // self.height
         y = index % self.height
         return x, y
 
-    def _unpackBits(self, bits):
+    def _unpackBits(self, bits, initialValue=False):
         """
-        Fills in data from a bit-level representation
+        Fills in data from a bit-level representation; cells past the end of
+        bits are set to initialValue
         """
-        cell = 0
         for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height: break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
-
-    def _unpackInt(self, packed, size):
-        bools = []
-        if packed < 0: raise ValueError("must be a positive integer")
-        for i in range(size):
-            n = 2 ** (self.CELLS_PER_INT - i - 1)
-            if packed >= n:
-                bools.append(True)
-                packed -= n
-            else:
-                bools.append(False)
-        return bools
+            if packed < 0: raise ValueError("must be a positive integer")
+        numCells = self.width * self.height
+        digits = ''.join([format(packed, '0%db' % self.CELLS_PER_INT) for packed in bits])
+        self._setCellDigits(digits[:numCells].ljust(numCells, '1' if initialValue else '0'))
+
+# Byte translation tables between cells stored as 0/1 bytes and '0'/'1' digits
+_CELLS_TO_DIGITS = bytes.maketrans(b'\x00\x01', b'01')
+_DIGITS_TO_CELLS = bytes.maketrans(b'01', b'\x00\x01')
 
 def reconstituteGrid(bitRep):
+    if type(bitRep) is bytes:
+        return Grid.fromBytes(bitRep)
     if type(bitRep) is not type((1,2)):
         return bitRep
     width, height = bitRep[:2]